@@ -2,6 +2,18 @@
 
 import unittest
 from which_floor import description_to_final_floor, get_first_basement_position
+from which_floor import bytes_to_final_floor, bytes_first_basement_position
+from which_floor import stream_to_final_floor, stream_first_basement_position
+from which_floor import parallel_first_basement_position
+from which_floor import FloorIndex
+from tempfile import TemporaryDirectory
+import io
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class TestExamples(unittest.TestCase):
@@ -30,5 +42,199 @@ class TestExamples(unittest.TestCase):
         self.assertEqual(5, get_first_basement_position('()())'))
 
 
+class TestBytesEngine(unittest.TestCase):
+
+    def test_bytes_to_final_floor(self):
+        self.assertEqual(0, bytes_to_final_floor(b''))
+        self.assertEqual(0, bytes_to_final_floor(b'()()'))
+        self.assertEqual(3, bytes_to_final_floor(b'))((((('))
+        self.assertEqual(-3, bytes_to_final_floor(b')())())'))
+
+    def test_bytes_to_final_floor_rejects_invalid(self):
+        with self.assertRaises(ValueError):
+            bytes_to_final_floor(b'(()a)')
+
+    def test_bytes_first_basement_position(self):
+        self.assertEqual(0, bytes_first_basement_position(b''))
+        self.assertEqual(0, bytes_first_basement_position(b'()()('))
+        self.assertEqual(1, bytes_first_basement_position(b')))'))
+        self.assertEqual(5, bytes_first_basement_position(b'()())'))
+
+    def test_bytes_first_basement_position_across_chunks(self):
+        description = b'(' * 10 + b')' * 11 + b'(('
+        for chunk_size in (1, 2, 3, 7, 21, 100):
+            self.assertEqual(21, bytes_first_basement_position(
+                description, chunk_size=chunk_size))
+
+    def test_bytes_first_basement_position_rejects_invalid(self):
+        with self.assertRaises(ValueError):
+            bytes_first_basement_position(b'((\n))', chunk_size=2)
+        with self.assertRaises(ValueError):
+            bytes_first_basement_position(b'()x)')
+
+    def test_bytes_first_basement_position_stops_at_basement(self):
+        # Like the str engine, bytes after the basement position are not
+        # checked.
+        self.assertEqual(1, get_first_basement_position(')x'))
+        self.assertEqual(1, bytes_first_basement_position(b')x'))
+        self.assertEqual(3, bytes_first_basement_position(b'())x'))
+
+    def test_matches_str_engine(self):
+        description = '(()))(()()))((()' * 50
+        self.assertEqual(
+            description_to_final_floor(description),
+            bytes_to_final_floor(description.encode()))
+        self.assertEqual(
+            get_first_basement_position(description),
+            bytes_first_basement_position(description.encode(), chunk_size=3))
+
+
+class TestStreamEngine(unittest.TestCase):
+
+    def test_stream_to_final_floor(self):
+        self.assertEqual(0, stream_to_final_floor(io.BytesIO(b'')))
+        self.assertEqual(3, stream_to_final_floor(io.BytesIO(b'(()(()(\n')))
+        for chunk_size in (1, 2, 5):
+            self.assertEqual(-3, stream_to_final_floor(
+                io.BytesIO(b')())())'), chunk_size=chunk_size))
+
+    def test_stream_to_final_floor_rejects_invalid(self):
+        with self.assertRaises(ValueError):
+            stream_to_final_floor(io.BytesIO(b'(()a)'), chunk_size=2)
+
+    def test_stream_first_basement_position(self):
+        self.assertEqual(0, stream_first_basement_position(io.BytesIO(b'()()(')))
+        description = b'(' * 10 + b')' * 11 + b'(('
+        for chunk_size in (1, 2, 3, 7, 21, 100):
+            self.assertEqual(21, stream_first_basement_position(
+                io.BytesIO(description), chunk_size=chunk_size))
+
+    def test_stream_first_basement_position_stops_reading(self):
+        stream = io.BytesIO(b'))' + b'x' * 10)
+        self.assertEqual(1, stream_first_basement_position(stream, chunk_size=2))
+        self.assertEqual(2, stream.tell())
+
+
+class TestParallelBasementSearch(unittest.TestCase):
+
+    def test_never_in_basement(self):
+        self.assertEqual(0, parallel_first_basement_position(
+            io.BytesIO(b'()()((()'), processes=2, chunk_size=3))
+
+    def test_basement_positions(self):
+        description = b'(' * 10 + b')' * 11 + b'(('
+        for chunk_size in (1, 2, 3, 7, 21, 100):
+            self.assertEqual(21, parallel_first_basement_position(
+                io.BytesIO(description), processes=2, chunk_size=chunk_size))
+
+    def test_matches_str_engine(self):
+        description = '((()))())(' * 30 + ')' * 40
+        self.assertEqual(
+            get_first_basement_position(description),
+            parallel_first_basement_position(
+                io.BytesIO(description.encode()), processes=3, chunk_size=16))
+
+    def test_rejects_invalid(self):
+        with self.assertRaises(ValueError):
+            parallel_first_basement_position(
+                io.BytesIO(b'((((a))'), processes=2, chunk_size=2)
+
+    def test_stops_at_basement(self):
+        # An unexpected byte in a later chunk of the same batch does not
+        # matter once the basement is reached.
+        self.assertEqual(3, parallel_first_basement_position(
+            io.BytesIO(b'())((a'), processes=2, chunk_size=2))
+        self.assertEqual(1, parallel_first_basement_position(
+            io.BytesIO(b')x'), processes=2, chunk_size=4))
+
+
+@unittest.skipIf(numpy is None, 'FloorIndex requires NumPy')
+class TestFloorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.description = '((()))())(' * 1000 + ')' * 1000 + '((' * 600
+        self.floors = [0]
+        for character in self.description:
+            step = 1 if character == '(' else -1
+            self.floors.append(self.floors[-1] + step)
+        self.index = FloorIndex.build(io.BytesIO(self.description.encode()))
+
+    def expected_first_reach(self, floor):
+        for position, position_floor in enumerate(self.floors[1:], start=1):
+            if position_floor == floor:
+                return position
+        return 0
+
+    def test_empty_description(self):
+        index = FloorIndex.build(io.BytesIO(b''))
+        self.assertEqual(0, index.floor_at(0))
+        self.assertEqual(0, index.first_reach(-1))
+
+    def test_build_from_unsized_stream(self):
+        # Streams whose length is unknown, such as pipes, grow the floors as
+        # they are read.
+        read_fd, write_fd = os.pipe()
+        with open(write_fd, 'wb') as writer:
+            writer.write(self.description[:5000].encode())
+        with open(read_fd, 'rb') as reader:
+            index = FloorIndex.build(reader, chunk_size=7)
+        self.assertEqual(5000, index.get_num_positions())
+        for position in (0, 1, 4999, 5000):
+            self.assertEqual(self.floors[position], index.floor_at(position))
+
+    def test_floor_at(self):
+        for position in (0, 1, 9999, 10000, len(self.description)):
+            self.assertEqual(
+                self.floors[position], self.index.floor_at(position))
+        with self.assertRaises(IndexError):
+            self.index.floor_at(len(self.description) + 1)
+
+    def test_first_reach(self):
+        for floor in (-1000, -900, -1, 0, 1, 3, 4, 1000):
+            self.assertEqual(
+                self.expected_first_reach(floor),
+                self.index.first_reach(floor))
+
+    def test_first_reach_matches_basement_position(self):
+        self.assertEqual(
+            get_first_basement_position(self.description),
+            self.index.first_reach(-1))
+
+    def test_save_and_load(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index')
+            self.index.save(path)
+            loaded = FloorIndex.load(path)
+            self.assertEqual(
+                self.index.get_num_positions(), loaded.get_num_positions())
+            self.assertEqual(self.floors[-1], loaded.floor_at(
+                loaded.get_num_positions()))
+            self.assertEqual(
+                self.expected_first_reach(-1000), loaded.first_reach(-1000))
+
+    def test_rejects_invalid(self):
+        with self.assertRaises(ValueError):
+            FloorIndex.build(io.BytesIO(b'(()a)'))
+
+    def test_is_built_from(self):
+        with TemporaryDirectory() as directory:
+            description_path = os.path.join(directory, 'description.txt')
+            with open(description_path, 'wb') as description_file:
+                description_file.write(b'(()(')
+            index_path = os.path.join(directory, 'index')
+            with open(description_path, 'rb') as description_file:
+                FloorIndex.build(description_file).save(index_path)
+
+            loaded = FloorIndex.load(index_path)
+            with open(description_path, 'rb') as description_file:
+                self.assertTrue(loaded.is_built_from(description_file))
+            with open(description_path, 'ab') as description_file:
+                description_file.write(b')')
+            with open(description_path, 'rb') as description_file:
+                self.assertFalse(loaded.is_built_from(description_file))
+            # In memory descriptions cannot be identified.
+            self.assertFalse(loaded.is_built_from(io.BytesIO(b'(()(')))
+
+
 if __name__ == '__main__':
     unittest.main()
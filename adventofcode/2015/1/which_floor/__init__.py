@@ -1 +1,5 @@
 from .which_floor import description_to_final_floor, get_first_basement_position
+from .which_floor import bytes_to_final_floor, bytes_first_basement_position
+from .which_floor import stream_to_final_floor, stream_first_basement_position
+from .which_floor import parallel_first_basement_position
+from .which_floor import FloorIndex
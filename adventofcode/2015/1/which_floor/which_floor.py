@@ -1,8 +1,24 @@
 #!/usr/bin/env python3
 
 import argparse
+import io
+import multiprocessing
+import os
+import stat
 import sys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The number of description bytes processed at a time by the bytes engine.
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# The number of description bytes summarized at a time by each process of the
+# parallel basement search.
+PARALLEL_CHUNK_SIZE = 1 << 24
+
 
 def description_to_final_floor(description):
     """
@@ -73,6 +89,724 @@ def get_first_basement_position(description):
     return 0
 
 
+def _raise_unexpected_byte(description, offset=0):
+    """
+    Raise a ValueError describing the first byte in @a description that is not
+    an open or closed parenthesis.
+
+    Args:
+        description (bytes): The description containing the unexpected byte.
+        offset (int): The number of description bytes preceding
+        @a description, used to report the position of the byte.
+
+    Raises:
+        ValueError always.
+    """
+    unexpected = description.translate(None, b'()')[:1]
+    position = description.index(unexpected) + offset + 1
+    raise ValueError(
+        f"Unexpected character '{chr(unexpected[0])}' at position {position}")
+
+
+def _find_floor_in_chunk(chunk, floor, target, offset=0):
+    """
+    Walk @a chunk starting at @a floor looking for the first step at which
+    Santa drops to @a target.
+
+    Args:
+        chunk (bytes): A piece of a parentheses style description.
+        floor (int): The floor Santa is on before the first byte in @a chunk.
+        target (int): The floor to look for. It must be below @a floor.
+        offset (int): The number of description bytes preceding @a chunk,
+        used to report the position of an unexpected byte.
+
+    Raises:
+        ValueError if @a chunk contains anything other than an open or closed
+        parenthesis before @a target is reached.
+
+    Return
+        (int, int) The floor Santa stopped on and the 1-based index into
+        @a chunk at which @a target was first reached, or 0 if it was not. The
+        walk stops early when @a target is reached, so bytes after that point
+        are not checked.
+
+    >>> _find_floor_in_chunk(b'()())(', 0, -1)
+    (-1, 5)
+    >>> _find_floor_in_chunk(b'(()', 3, -1)
+    (4, 0)
+    >>> _find_floor_in_chunk(b')x', 0, -1)
+    (-1, 1)
+    """
+    if not chunk:
+        return floor, 0
+
+    if np is None:
+        for index, character in enumerate(chunk):
+            if character == 0x28:
+                floor += 1
+            elif character == 0x29:
+                floor -= 1
+                if floor == target:
+                    return floor, index + 1
+            else:
+                _raise_unexpected_byte(chunk, offset)
+        return floor, 0
+
+    values = np.frombuffer(chunk, dtype=np.uint8)
+    # '(' is 0x28 and ')' is 0x29, so anything else maps past 1 once the
+    # unsigned subtraction wraps.
+    relative = values - np.uint8(0x28)
+    # Only walk up to the first unexpected byte, which is reported only if
+    # the target is not reached before it, as the pure Python walk does.
+    unexpected = relative > 1
+    valid_length = len(relative)
+    if unexpected.any():
+        valid_length = int(np.argmax(unexpected))
+    # Map '(' to 1 and ')' to -1.
+    steps = 1 - 2 * relative[:valid_length].astype(np.int64)
+    floors = np.cumsum(steps)
+    floors += floor
+    if valid_length and floors.min() <= target:
+        # Floors change by one at a time, so the first floor at or below the
+        # target is the target itself.
+        index = int(np.argmax(floors <= target))
+        return target, index + 1
+    if valid_length < len(relative):
+        _raise_unexpected_byte(chunk, offset)
+    return int(floors[-1]), 0
+
+
+def bytes_to_final_floor(description):
+    """
+    Convert the given bytes description to a floor number.
+
+    This produces the same result as description_to_final_floor but counts the
+    parentheses in C rather than walking the description in Python.
+
+    Args:
+        description (bytes): A parentheses style description of the floor
+        number.
+
+    Raises:
+        ValueError if @a description contains anything other than an open or
+        closed parenthesis.
+
+    Return
+        (int) An integer describing the final floor level.
+
+    >>> bytes_to_final_floor(b'(()(()(')
+    3
+    """
+    up_count = description.count(b'(')
+    down_count = description.count(b')')
+    if up_count + down_count != len(description):
+        _raise_unexpected_byte(description)
+    return up_count - down_count
+
+
+def bytes_first_basement_position(description, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Given the bytes floor description, determine the first position in the
+    description in which Santa is in the basement.
+
+    This produces the same result as get_first_basement_position. The
+    description is processed @a chunk_size bytes at a time with a cumulative
+    sum, stopping at the first chunk in which Santa reaches the basement.
+
+    Args:
+        description (bytes): A parentheses style description of the floor
+        number.
+        chunk_size (int): The number of bytes to process at a time.
+
+    Raises:
+        ValueError if the scanned chunks of @a description contain anything
+        other than an open or closed parenthesis. Chunks after the one in
+        which Santa reaches the basement are not scanned.
+
+    Return
+        (int) The 1-based position in @a description in which Santa first is
+        in the basement, or 0 if he never is.
+
+    >>> bytes_first_basement_position(b'()())')
+    5
+    >>> bytes_first_basement_position(b'()())', chunk_size=2)
+    5
+    """
+    if chunk_size < 1:
+        raise ValueError(f'chunk_size must be positive, got: {chunk_size}')
+    view = memoryview(description)
+    floor = 0
+    for offset in range(0, len(description), chunk_size):
+        chunk = view[offset:offset + chunk_size].tobytes()
+        floor, index = _find_floor_in_chunk(chunk, floor, -1, offset)
+        if index:
+            return offset + index
+    # He never wound up in the basement. Return 0.
+    return 0
+
+
+def stream_to_final_floor(stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Read a floor description from @a stream and convert it to a floor number.
+
+    The description is read @a chunk_size bytes at a time so that arbitrarily
+    large descriptions are processed in constant memory. Line endings are
+    ignored so that descriptions stored in text files can be used.
+
+    Args:
+        stream (binary file): The stream from which to read the description.
+        chunk_size (int): The number of bytes to read at a time.
+
+    Raises:
+        ValueError if the description contains anything other than an open or
+        closed parenthesis.
+
+    Return
+        (int) An integer describing the final floor level.
+
+    >>> import io
+    >>> stream_to_final_floor(io.BytesIO(b'(()(()(\\n'), chunk_size=2)
+    3
+    """
+    if chunk_size < 1:
+        raise ValueError(f'chunk_size must be positive, got: {chunk_size}')
+    floor = 0
+    offset = 0
+    while chunk := stream.read(chunk_size):
+        chunk = chunk.translate(None, b'\r\n')
+        up_count = chunk.count(b'(')
+        down_count = chunk.count(b')')
+        if up_count + down_count != len(chunk):
+            _raise_unexpected_byte(chunk, offset)
+        floor += up_count - down_count
+        offset += len(chunk)
+    return floor
+
+
+def stream_first_basement_position(stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Read a floor description from @a stream and determine the first position
+    in the description in which Santa is in the basement.
+
+    The description is read @a chunk_size bytes at a time, carrying the floor
+    and position across chunks, and reading stops as soon as Santa reaches the
+    basement. Line endings are ignored and do not count as positions.
+
+    Args:
+        stream (binary file): The stream from which to read the description.
+        chunk_size (int): The number of bytes to read at a time.
+
+    Raises:
+        ValueError if the read chunks of the description contain anything
+        other than an open or closed parenthesis.
+
+    Return
+        (int) The 1-based position in the description in which Santa first is
+        in the basement, or 0 if he never is.
+
+    >>> import io
+    >>> stream_first_basement_position(io.BytesIO(b'()())\\n'), chunk_size=2)
+    5
+    """
+    if chunk_size < 1:
+        raise ValueError(f'chunk_size must be positive, got: {chunk_size}')
+    floor = 0
+    offset = 0
+    while chunk := stream.read(chunk_size):
+        chunk = chunk.translate(None, b'\r\n')
+        floor, index = _find_floor_in_chunk(chunk, floor, -1, offset)
+        if index:
+            return offset + index
+        offset += len(chunk)
+    # He never wound up in the basement. Return 0.
+    return 0
+
+
+def _summarize_chunk(chunk):
+    """
+    Summarize the walk through @a chunk starting from floor 0, up to the
+    first unexpected byte, if any.
+
+    Unexpected bytes are not rejected here: they only matter if Santa has not
+    reached the basement before them, which depends on the chunks before this
+    one.
+
+    Args:
+        chunk (bytes): A piece of a parentheses style description.
+
+    Return
+        (int, int, int, int) The net change in floor across the valid start
+        of @a chunk, the lowest floor reached in it, the 1-based index in
+        @a chunk at which that floor is first reached, and the length of the
+        valid start. An empty chunk is summarized as (0, 0, 0, 0).
+
+    >>> _summarize_chunk(b'(())))(')
+    (-1, -2, 6, 7)
+    >>> _summarize_chunk(b'())x)')
+    (-1, -1, 3, 3)
+    """
+    if not chunk:
+        return 0, 0, 0, 0
+
+    if np is None:
+        floor = 0
+        lowest_floor = 0
+        lowest_index = 0
+        valid_length = 0
+        for index, character in enumerate(chunk):
+            if character == 0x28:
+                floor += 1
+            elif character == 0x29:
+                floor -= 1
+            else:
+                break
+            valid_length = index + 1
+            if lowest_index == 0 or floor < lowest_floor:
+                lowest_floor = floor
+                lowest_index = index + 1
+        return floor, lowest_floor, lowest_index, valid_length
+
+    relative = np.frombuffer(chunk, dtype=np.uint8) - np.uint8(0x28)
+    unexpected = relative > 1
+    valid_length = len(relative)
+    if unexpected.any():
+        valid_length = int(np.argmax(unexpected))
+    if valid_length == 0:
+        return 0, 0, 0, 0
+    floors = np.cumsum(1 - 2 * relative[:valid_length].astype(np.int64))
+    lowest_index = int(np.argmin(floors))
+    return (int(floors[-1]), int(floors[lowest_index]), lowest_index + 1,
+            valid_length)
+
+
+def parallel_first_basement_position(
+        stream, processes=None, chunk_size=PARALLEL_CHUNK_SIZE):
+    """
+    Read a floor description from @a stream and determine the first position
+    in the description in which Santa is in the basement, using a pool of
+    processes.
+
+    Each process summarizes a chunk of the description as its net floor
+    change and the lowest floor reached within it. Combining the summaries in
+    order identifies the chunk in which Santa first reaches the basement, and
+    only that chunk is walked a second time to find the exact position. At
+    most two chunks per process are held in memory at a time, and reading
+    stops after the batch containing the basement position.
+
+    Line endings are ignored and do not count as positions.
+
+    Args:
+        stream (binary file): The stream from which to read the description.
+        Wrap an in memory description with io.BytesIO.
+        processes (int): The number of processes to use. Defaults to the
+        number of CPUs.
+        chunk_size (int): The number of bytes each process summarizes at a
+        time.
+
+    Raises:
+        ValueError if the read chunks of the description contain anything
+        other than an open or closed parenthesis.
+
+    Return
+        (int) The 1-based position in the description in which Santa first is
+        in the basement, or 0 if he never is.
+    """
+    if chunk_size < 1:
+        raise ValueError(f'chunk_size must be positive, got: {chunk_size}')
+    if processes is None:
+        processes = os.cpu_count() or 1
+    batch_size = 2 * processes
+
+    floor = 0
+    offset = 0
+    with multiprocessing.Pool(processes) as pool:
+        while True:
+            chunks = []
+            while len(chunks) < batch_size:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                chunks.append(chunk.translate(None, b'\r\n'))
+            if not chunks:
+                break
+
+            summaries = pool.map(_summarize_chunk, chunks)
+            for chunk, summary in zip(chunks, summaries):
+                delta, lowest_floor, _, valid_length = summary
+                if floor + lowest_floor <= -1:
+                    _, index = _find_floor_in_chunk(chunk, floor, -1, offset)
+                    return offset + index
+                if valid_length < len(chunk):
+                    # Santa did not reach the basement before this byte.
+                    _raise_unexpected_byte(chunk, offset)
+                floor += delta
+                offset += len(chunk)
+    # He never wound up in the basement. Return 0.
+    return 0
+
+
+def _remaining_stream_size(stream):
+    """
+    Return the number of bytes left to read from @a stream, or None if that
+    cannot be determined, as for pipes.
+    """
+    try:
+        position = stream.tell()
+        size = stream.seek(0, io.SEEK_END)
+        stream.seek(position)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return size - position
+
+
+def _file_signature(file):
+    """
+    Return the (device, inode, size, modification time in nanoseconds) of
+    the regular file open as @a file, which identifies the file and version
+    an index was built from, or None if @a file is not a regular file, as for
+    stdin.
+    """
+    try:
+        status = os.fstat(file.fileno())
+    except (AttributeError, OSError, ValueError):
+        return None
+    if not stat.S_ISREG(status.st_mode):
+        return None
+    return (status.st_dev, status.st_ino, status.st_size,
+            status.st_mtime_ns)
+
+
+def _floor_dtype(num_floors):
+    """
+    Return the narrowest integer type that holds the floors of a description
+    of up to @a num_floors - 1 positions.
+    """
+    # Floors are bounded by the description length.
+    return np.int32 if num_floors < 2**31 else np.int64
+
+
+class FloorIndex:
+    """
+    A persistent index over a floor description for answering many queries
+    about the same description.
+
+    The index stores the floor after every position of the description as a
+    compact array of prefix sums, along with sparse tables of the lowest and
+    highest floors reached within power of two runs of fixed size blocks of
+    that array. The floor at any position is a lookup and the first position
+    at which any floor is reached is found with a O(log n) descent of the
+    sparse tables followed by a scan of a single block.
+
+    The index is saved as a directory of .npy files which are memory mapped
+    when loaded so that later runs do not need to read the whole index. When
+    built from a regular file, the file's identity, size and modification
+    time are saved too so that the index can be checked against the file
+    later.
+    """
+
+    # The number of prefix sums summarized by each sparse table entry.
+    BLOCK_SIZE = 4096
+
+    _FLOORS_FILE = 'floors.npy'
+    _MIN_TABLE_FILE = 'min_table.npy'
+    _MAX_TABLE_FILE = 'max_table.npy'
+    _SOURCE_FILE = 'source.npy'
+
+    def __init__(self, floors, min_table, max_table, source=None):
+        """
+        Initialize the index from its arrays. Use build or load to create an
+        index.
+
+        Args:
+            floors (numpy array): The floor after each position, starting
+            with floor 0 at position 0.
+            min_table (numpy array): The sparse table of block minimums.
+            max_table (numpy array): The sparse table of block maximums.
+            source (tuple of int): The identity, size and modification time
+            of the file the index was built from, if it was built from a
+            regular file.
+        """
+        self._source = source
+        self._floors = floors
+        self._min_table = min_table
+        self._max_table = max_table
+        self._num_blocks = min_table.shape[1]
+
+    @classmethod
+    def build(cls, stream, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Build an index for the floor description read from @a stream.
+
+        Line endings are ignored and do not count as positions.
+
+        Args:
+            stream (binary file): The stream from which to read the
+            description. Wrap an in memory description with io.BytesIO.
+            chunk_size (int): The number of bytes to read at a time.
+
+        Raises:
+            ValueError if the description contains anything other than an open
+            or closed parenthesis.
+
+        Return
+            (FloorIndex) The index over the description.
+
+        >>> index = FloorIndex.build(io.BytesIO(b'()())'))
+        >>> index.floor_at(3)
+        1
+        >>> index.first_reach(-1)
+        5
+        """
+        if np is None:
+            raise RuntimeError('NumPy is required to build a FloorIndex.')
+        if chunk_size < 1:
+            raise ValueError(f'chunk_size must be positive, got: {chunk_size}')
+
+        source = _file_signature(stream)
+        # Size the array of floors from the stream's length when it is known,
+        # which is an upper bound once line endings are removed, so that each
+        # chunk's floors are summed straight into place. Otherwise, grow it
+        # as needed.
+        capacity = (_remaining_stream_size(stream) or chunk_size) + 1
+        floors = np.zeros(capacity, dtype=_floor_dtype(capacity))
+        num_floors = 1
+        floor = 0
+        offset = 0
+        while chunk := stream.read(chunk_size):
+            chunk = chunk.translate(None, b'\r\n')
+            if not chunk:
+                continue
+            relative = np.frombuffer(chunk, dtype=np.uint8) - np.uint8(0x28)
+            if relative.max() > 1:
+                _raise_unexpected_byte(chunk, offset)
+            end = num_floors + len(chunk)
+            if end > len(floors):
+                capacity = max(end, 2 * len(floors))
+                grown = np.empty(capacity, dtype=_floor_dtype(capacity))
+                grown[:num_floors] = floors[:num_floors]
+                floors = grown
+            # Map '(' to 1 and ')' to -1 without widening the chunk.
+            steps = 1 - 2 * relative.view(np.int8)
+            piece = floors[num_floors:end]
+            np.cumsum(steps, dtype=floors.dtype, out=piece)
+            piece += floor
+            floor = int(piece[-1])
+            offset += len(chunk)
+            num_floors = end
+        floors = floors[:num_floors]
+
+        # Summarize the full blocks through a view and the partial last block
+        # on its own, so no padded copy of the floors is needed. The partial
+        # block's extremes are those of its floors alone, just as if it were
+        # padded with its last floor.
+        num_full_blocks = num_floors // cls.BLOCK_SIZE
+        full_blocks = floors[:num_full_blocks * cls.BLOCK_SIZE].reshape(
+            num_full_blocks, cls.BLOCK_SIZE)
+        block_mins = [full_blocks.min(axis=1)]
+        block_maxes = [full_blocks.max(axis=1)]
+        tail = floors[num_full_blocks * cls.BLOCK_SIZE:]
+        if len(tail):
+            block_mins.append(tail.min(keepdims=True))
+            block_maxes.append(tail.max(keepdims=True))
+        min_table = cls._build_sparse_table(
+            np.concatenate(block_mins), np.minimum)
+        max_table = cls._build_sparse_table(
+            np.concatenate(block_maxes), np.maximum)
+        return cls(floors, min_table, max_table, source)
+
+    @staticmethod
+    def _build_sparse_table(values, combine):
+        """
+        Build a sparse table over @a values.
+
+        Row j of the table holds, for each index b, @a combine applied across
+        values[b:b + 2**j]. Entries for runs extending past the end of
+        @a values are left as the last value of the row below.
+
+        Args:
+            values (numpy array): The values to summarize.
+            combine (numpy ufunc): The binary function combining two values.
+
+        Return
+            (numpy array) The two dimensional sparse table.
+        """
+        levels = max(1, len(values).bit_length())
+        table = np.empty((levels, len(values)), dtype=values.dtype)
+        table[0] = values
+        for level in range(1, levels):
+            half = 1 << (level - 1)
+            table[level] = table[level - 1]
+            combine(table[level - 1][:-half], table[level - 1][half:],
+                    out=table[level][:-half])
+        return table
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Load an index previously saved to @a directory, memory mapping its
+        arrays.
+
+        Args:
+            directory (str): The directory the index was saved to.
+
+        Raises:
+            ValueError if the saved arrays are inconsistent with each other.
+
+        Return
+            (FloorIndex) The loaded index.
+        """
+        if np is None:
+            raise RuntimeError('NumPy is required to load a FloorIndex.')
+        floors = np.load(os.path.join(directory, cls._FLOORS_FILE),
+                         mmap_mode='r')
+        min_table = np.load(os.path.join(directory, cls._MIN_TABLE_FILE),
+                            mmap_mode='r')
+        max_table = np.load(os.path.join(directory, cls._MAX_TABLE_FILE),
+                            mmap_mode='r')
+        num_blocks = -(-len(floors) // cls.BLOCK_SIZE)
+        if (min_table.shape != max_table.shape or
+                min_table.shape[1] != num_blocks):
+            raise ValueError(f'Inconsistent floor index in: {directory}')
+        source = None
+        source_path = os.path.join(directory, cls._SOURCE_FILE)
+        if os.path.exists(source_path):
+            source = tuple(np.load(source_path).tolist())
+        return cls(floors, min_table, max_table, source)
+
+    def save(self, directory):
+        """
+        Save the index to @a directory, creating it if needed.
+
+        Args:
+            directory (str): The directory to save the index to.
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, self._FLOORS_FILE), self._floors)
+        np.save(os.path.join(directory, self._MIN_TABLE_FILE),
+                self._min_table)
+        np.save(os.path.join(directory, self._MAX_TABLE_FILE),
+                self._max_table)
+        if self._source is not None:
+            np.save(os.path.join(directory, self._SOURCE_FILE),
+                    np.array(self._source, dtype=np.int64))
+
+    def is_built_from(self, file):
+        """
+        Determine whether the index was built from the current version of the
+        regular file open as @a file.
+
+        Args:
+            file (file): The open file to check.
+
+        Return
+            (bool) Whether the file's identity, size and modification time
+            match those recorded when the index was built.
+        """
+        source = _file_signature(file)
+        return source is not None and source == self._source
+
+    def get_num_positions(self):
+        """
+        Return the number of positions in the indexed description.
+
+        Return (int): The length of the description.
+        """
+        return len(self._floors) - 1
+
+    def floor_at(self, position):
+        """
+        Return the floor Santa is on after following @a position characters
+        of the description.
+
+        Args:
+            position (int): The position in the description, from 0 for before
+            the first character to the description's length.
+
+        Raises:
+            IndexError if @a position is outside of the description.
+
+        Return (int): The floor at @a position.
+
+        >>> index = FloorIndex.build(io.BytesIO(b'(()(()('))
+        >>> index.floor_at(0)
+        0
+        >>> index.floor_at(7)
+        3
+        """
+        if not 0 <= position < len(self._floors):
+            raise IndexError(
+                f'Position {position} is outside of the description of '
+                f'length {self.get_num_positions()}')
+        return int(self._floors[position])
+
+    def first_reach(self, floor):
+        """
+        Determine the first position in the description in which Santa is on
+        @a floor.
+
+        Indexing starts at 1, as with get_first_basement_position.
+
+        Args:
+            floor (int): The floor to search for.
+
+        Return
+            (int) The first position at which Santa is on @a floor, or 0 if he
+            never is.
+
+        >>> index = FloorIndex.build(io.BytesIO(b'(()(()('))
+        >>> index.first_reach(2)
+        2
+        >>> index.first_reach(-1)
+        0
+        """
+        if len(self._floors) < 2:
+            return 0
+        first_floor = int(self._floors[1])
+        if first_floor == floor:
+            return 1
+        # Floors change by one at a time, so the first floor at or beyond the
+        # searched for floor, approached from the first floor, is the floor
+        # itself.
+        if floor < first_floor:
+            return self._find_first(1, self._min_table, lambda v: v <= floor)
+        return self._find_first(1, self._max_table, lambda v: v >= floor)
+
+    def _find_first(self, start, table, matches):
+        """
+        Find the first position at or after @a start whose floor matches.
+
+        Args:
+            start (int): The position to start searching from.
+            table (numpy array): The sparse table summarizing blocks such that
+            a block contains a match only if its summary matches.
+            matches (callable): The predicate applied to floors and summaries.
+
+        Return
+            (int) The first matching position, or 0 if none matches.
+        """
+        block = start // self.BLOCK_SIZE
+        block_end = min((block + 1) * self.BLOCK_SIZE, len(self._floors))
+        hits = np.flatnonzero(matches(self._floors[start:block_end]))
+        if len(hits):
+            return start + int(hits[0])
+
+        # Skip, from the largest run down, every run of blocks which contains
+        # no match.
+        block += 1
+        for level in reversed(range(table.shape[0])):
+            run = 1 << level
+            if (block + run <= self._num_blocks and
+                    not matches(table[level][block])):
+                block += run
+        if block >= self._num_blocks:
+            return 0
+
+        block_start = block * self.BLOCK_SIZE
+        block_end = min(block_start + self.BLOCK_SIZE, len(self._floors))
+        hits = np.flatnonzero(matches(self._floors[block_start:block_end]))
+        return block_start + int(hits[0])
+
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description='Convert a floor description to an integer.')
@@ -84,20 +818,126 @@ def parse_args():
         help='Find the first position in which Santa is in the basement.')
 
     parser.add_argument(
-        'floor_description', type=str,
+        '-f', '--file',
+        type=argparse.FileType('rb'),
+        help='Read the floor description from the given file rather than '
+        'from the command line. Use - to read from stdin.')
+
+    parser.add_argument(
+        'floor_description', type=str, nargs='?',
         help='A description of which floor Santa should go to.')
 
-    return parser.parse_args()
+    parser.add_argument(
+        '-j', '--processes',
+        type=int,
+        help='Find the basement position using a pool of this many '
+        'processes. This helps with very large descriptions.')
+
+    parser.add_argument(
+        '-i', '--index',
+        type=str,
+        help='Answer queries using the floor index saved in this directory. '
+        'If the directory does not exist, the index is built from the '
+        'description and saved there.')
+
+    parser.add_argument(
+        '--floor_at',
+        type=int,
+        action='append',
+        default=[],
+        metavar='POSITION',
+        help='With --index, print the floor at the given position. '
+        'May be repeated.')
+
+    parser.add_argument(
+        '--first_reach',
+        type=int,
+        action='append',
+        default=[],
+        metavar='FLOOR',
+        help='With --index, print the first position at which Santa is on '
+        'the given floor. May be repeated.')
+
+    args = parser.parse_args()
+    if args.processes is not None and args.processes < 1:
+        parser.error(f'--processes must be positive, got: {args.processes}')
+    if (args.floor_at or args.first_reach) and args.index is None:
+        parser.error('--floor_at and --first_reach require --index.')
+    if args.index is not None and os.path.isdir(args.index):
+        if args.floor_description is not None:
+            parser.error('floor_description cannot be checked against an '
+                         'existing --index. Use --file with the file the '
+                         'index was built from, or no description.')
+    elif (args.file is None) == (args.floor_description is None):
+        parser.error('Provide exactly one of floor_description or --file.')
+    return args
+
+
+def query_index(args):
+    """
+    Answer the queries in @a args using the floor index, building and saving
+    the index first if it does not yet exist.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Raises:
+        ValueError if the index exists and a description file is given that
+        is not the one the index was built from, or has changed since.
+    """
+    if os.path.isdir(args.index):
+        index = FloorIndex.load(args.index)
+        if args.file is not None and not index.is_built_from(args.file):
+            raise ValueError(
+                f'The floor index in {args.index} was not built from the '
+                f'current {args.file.name}. Remove the index to rebuild it.')
+    else:
+        if args.file is not None:
+            stream = args.file
+        else:
+            stream = io.BytesIO(args.floor_description.encode())
+        index = FloorIndex.build(stream)
+        index.save(args.index)
+
+    if not args.floor_at and not args.first_reach:
+        if args.find_basement_position:
+            print(index.first_reach(-1))
+        else:
+            print(index.floor_at(index.get_num_positions()))
+    for position in args.floor_at:
+        print(index.floor_at(position))
+    for floor in args.first_reach:
+        print(index.first_reach(floor))
 
 
 def main():
     args = parse_args()
 
+    if args.index is not None:
+        query_index(args)
+        return 0
+
+    if args.find_basement_position and args.processes is not None:
+        if args.file is not None:
+            stream = args.file
+        else:
+            stream = io.BytesIO(args.floor_description.encode())
+        print(parallel_first_basement_position(stream, args.processes))
+        return 0
+
+    if args.file is not None:
+        if args.find_basement_position:
+            print(stream_first_basement_position(args.file))
+        else:
+            print(stream_to_final_floor(args.file))
+        return 0
+
+    description = args.floor_description.encode()
     if args.find_basement_position:
-        position = get_first_basement_position(args.floor_description)
+        position = bytes_first_basement_position(description)
         print(position)
     else:
-        floor = description_to_final_floor(args.floor_description)
+        floor = bytes_to_final_floor(description)
         print(floor)
     return 0
 
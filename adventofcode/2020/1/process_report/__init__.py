@@ -1 +1,3 @@
 from .process_report import find_two_entry_product, find_three_entry_product
+from .process_report import find_three_entry_products, find_k_entry_product
+from .process_report import find_subset_sum, ReportIndex
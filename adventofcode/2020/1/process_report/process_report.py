@@ -1,8 +1,17 @@
 #!/usr/bin/env python3
 
 import argparse
+import itertools
+import math
+import os
+import stat
 import sys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Parse expense reports.')
@@ -10,81 +19,691 @@ def parse_args():
     parser.add_argument(
         'expense_report',
         type=argparse.FileType('r'),
-        help='The file containing the expense report.')
+        nargs='?',
+        help='The file containing the expense report. This is not needed if '
+        'an existing --index is used.')
 
-    parser.add_argument(
+    entry_count = parser.add_mutually_exclusive_group()
+    entry_count.add_argument(
         '-3', '--three',
         action='store_true',
-        help='Return the product of three entries that sum to 2020. '
-        'By default, the product of two entries that sum to 2020 '
+        help='Return the product of three entries that sum to the target. '
+        'By default, the product of two entries that sum to the target '
         'is returned.')
 
-    return parser.parse_args()
+    entry_count.add_argument(
+        '-k', '--k',
+        type=int,
+        metavar='N',
+        help='Return the product of N entries that sum to the target.')
+
+    entry_count.add_argument(
+        '-s', '--subset_sum',
+        action='store_true',
+        help='Print the entries of any subset of the report, of any size, '
+        'that sums to the target. Entries and the target must not be '
+        'negative.')
+
+    parser.add_argument(
+        '-t', '--target',
+        type=int,
+        default=2020,
+        help='The value the entries should sum to. Default: 2020')
+
+    parser.add_argument(
+        '-n', '--numpy',
+        action='store_true',
+        help='With -3, use the vectorized NumPy engine, which is faster for '
+        'large reports.')
+
+    parser.add_argument(
+        '-a', '--all_products',
+        action='store_true',
+        help='With -3, print the product of every three entries that sum to '
+        'the target, one per line. This uses the NumPy engine.')
+
+    parser.add_argument(
+        '-i', '--index',
+        type=str,
+        help='Answer the query using the report index saved at this path. '
+        'If the path does not exist, the index is built from the expense '
+        'report and saved there.')
+
+    parser.add_argument(
+        '--targets',
+        type=argparse.FileType('r'),
+        help='A file of targets, one per line, to find the two or three '
+        'entry product for. Each target is printed with its product.')
 
+    args = parser.parse_args()
+    if args.index is not None:
+        args.index = ReportIndex.get_path(args.index)
+    use_index = args.index is not None or args.targets is not None
+    if (args.numpy or args.all_products) and not args.three:
+        parser.error('--numpy and --all_products require --three.')
+    if use_index and (args.k is not None or args.subset_sum or
+                      args.numpy or args.all_products):
+        parser.error('--index and --targets support only two or three entries.')
+    if args.expense_report is None and not (
+            args.index is not None and os.path.exists(args.index)):
+        parser.error('expense_report is required unless an existing --index '
+                     'is used.')
+    if args.k is not None and args.k < 1:
+        parser.error(f'--k must be positive, got: {args.k}')
+    return args
 
-def find_two_entry_product(numbers):
+
+def find_two_entry_product(numbers, target=2020):
     """
-    Given the list of numbers, print the product of two that sum to 2020.
+    Given the list of numbers, print the product of two that sum to target.
+
+    The numbers are scanned once, remembering those seen so far in a set, so
+    this runs in O(n) time.
 
-    numbers (list): A list of integers.
+    numbers (iterable): Integers.
+    target (int): The value the two entries should sum to.
 
-    Return (int): The product of two entries in numbers that sum to 2020.
+    Return (int): The product of two entries in numbers that sum to target.
 
     Raises:
-        ValueError if no two entries in numbers sums to 2020.
+        ValueError if no two entries in numbers sums to target.
 
     >>> l = [1721, 675, 299]
     >>> find_two_entry_product(l)
     514579
+    >>> find_two_entry_product([1010, 1010])
+    1020100
     """
-    for index, number1 in enumerate(numbers):
-        for number2 in numbers[index+1:]:
-            if (number1 + number2) == 2020:
-                return number1 * number2
-    raise ValueError('No two entries in numbers sums to 2020')
+    seen = set()
+    for number in numbers:
+        complement = target - number
+        if complement in seen:
+            return number * complement
+        seen.add(number)
+    raise ValueError(f'No two entries in numbers sums to {target}')
 
 
-def find_three_entry_product(numbers):
+def find_three_entry_product(numbers, target=2020):
     """
-    Given the list of numbers, print the product of three that sum to 2020.
+    Given the list of numbers, print the product of three that sum to target.
 
-    numbers (list): A list of integers.
+    The numbers are sorted and, for each entry, the remaining entries are
+    searched from both ends for a complementary pair, so this runs in O(n^2)
+    time.
 
-    Return (int): The product of three entries in numbers that sum to 2020.
+    numbers (iterable): Integers.
+    target (int): The value the three entries should sum to.
+
+    Return (int): The product of three entries in numbers that sum to target.
 
     Raises:
-        ValueError if no three entries in numbers sums to 2020.
+        ValueError if no three entries in numbers sums to target.
 
     >>> l = [979, 366, 675]
     >>> find_three_entry_product(l)
     241861950
+    >>> find_three_entry_product([10, 1000, 1000, 10], target=2010)
+    10000000
+    """
+    numbers = sorted(numbers)
+    for index1 in range(len(numbers) - 2):
+        number1 = numbers[index1]
+        low = index1 + 1
+        high = len(numbers) - 1
+        while low < high:
+            entry_sum = number1 + numbers[low] + numbers[high]
+            if entry_sum == target:
+                return number1 * numbers[low] * numbers[high]
+            if entry_sum < target:
+                low += 1
+            else:
+                high -= 1
+    raise ValueError(f'No three entries in numbers sums to {target}')
+
+
+def find_three_entry_products(numbers, target=2020, block_size=1024,
+                              first_only=False):
+    """
+    Given the list of numbers, return the products of every three that sum to
+    target, using NumPy.
+
+    The numbers are sorted into an array. For blocks of first entries and
+    blocks of second entries, the complement of every pair is computed by
+    broadcasting and the number of third entries equal to each complement is
+    found with searchsorted. Only block_size * block_size pairs are held in
+    memory at a time.
+
+    numbers (iterable): Integers.
+    target (int): The value the three entries should sum to.
+    block_size (int): The number of first and second entries considered at
+    a time.
+    first_only (bool): Return only the first product, stopping after the
+    first block of first entries with a match.
+
+    Return (list): The product of every three entries in numbers that sum to
+    target, one per combination of entries. Products are ordered by the
+    entries in ascending order, so the first is the product of the three
+    entries that come first when sorted.
+
+    Raises:
+        ValueError if no three entries in numbers sums to target.
+        RuntimeError if NumPy is not installed.
+
+    >>> find_three_entry_products([979, 366, 675])
+    [241861950]
+    >>> find_three_entry_products([1, 2, 3, 4, 5], target=9)
+    [15, 24]
+    >>> find_three_entry_products([1, 2, 3, 4, 5], target=9, first_only=True)
+    [15]
     """
-    for index1, number1 in enumerate(numbers):
-        for index2, number2 in enumerate(numbers[index1+1:]):
-            for number3 in numbers[index1 + index2 + 2:]:
-                if (number1 + number2 + number3) == 2020:
-                    return number1 * number2 * number3
-    raise ValueError('No three entries in numbers sums to 2020')
+    if np is None:
+        raise RuntimeError('NumPy is required to find all three entry products.')
+    if block_size < 1:
+        raise ValueError(f'block_size must be positive, got: {block_size}')
+    values = np.sort(np.fromiter(numbers, dtype=np.int64))
+    num_values = len(values)
+
+    products = []
+    for first_start in range(0, num_values, block_size):
+        first_end = min(first_start + block_size, num_values)
+        first_indices = np.arange(first_start, first_end)[:, None]
+        firsts = values[first_start:first_end, None]
+        matched_firsts = []
+        matched_seconds = []
+        matched_counts = []
+        for second_start in range(first_start, num_values, block_size):
+            second_end = min(second_start + block_size, num_values)
+            # Every later block only holds larger entries, so once the
+            # smallest possible sum exceeds the target there is nothing
+            # left to find for these first entries.
+            smallest_third = values[min(second_start + 1, num_values - 1)]
+            if values[first_start] + values[second_start] + smallest_third > target:
+                break
+            if values[first_end - 1] + values[second_end - 1] + values[-1] < target:
+                continue
+
+            second_indices = np.arange(second_start, second_end)[None, :]
+            complements = target - firsts - values[None, second_start:second_end]
+            low = np.searchsorted(values, complements, side='left')
+            high = np.searchsorted(values, complements, side='right')
+            # Third entries must come after the second.
+            low = np.maximum(low, second_indices + 1)
+            counts = np.where(second_indices > first_indices, high - low, 0)
+            rows, columns = np.nonzero(counts > 0)
+            matched_firsts.append(rows + first_start)
+            matched_seconds.append(columns + second_start)
+            matched_counts.append(counts[rows, columns])
+
+        if not matched_firsts:
+            continue
+        firsts_found = np.concatenate(matched_firsts)
+        seconds_found = np.concatenate(matched_seconds)
+        counts_found = np.concatenate(matched_counts)
+        order = np.lexsort((seconds_found, firsts_found))
+        if first_only:
+            # Later blocks only hold larger first entries, so the first
+            # product is in the first block with a match.
+            order = order[:1]
+            counts_found = np.ones_like(counts_found)
+        for first, second, count in zip(firsts_found[order].tolist(),
+                                         seconds_found[order].tolist(),
+                                         counts_found[order].tolist()):
+            first_value = int(values[first])
+            second_value = int(values[second])
+            third_value = target - first_value - second_value
+            products.extend([first_value * second_value * third_value] * count)
+        if first_only and products:
+            return products
+
+    if not products:
+        raise ValueError(f'No three entries in numbers sums to {target}')
+    return products
+
+
+def find_k_entry_product(numbers, k, target=2020):
+    """
+    Given the list of numbers, print the product of k that sum to target.
+
+    This is a meet in the middle search: the sums of every combination of
+    k // 2 entries are tabled by sum, then every combination of the remaining
+    k - k // 2 entries looks up its complement in the table, skipping tabled
+    combinations that share an entry with it. This takes roughly O(n^(k/2))
+    time rather than the O(n^k) of trying every combination of k entries.
+
+    numbers (iterable): Integers.
+    k (int): The number of entries which should sum to target.
+    target (int): The value the k entries should sum to.
+
+    Return (int): The product of k entries in numbers that sum to target.
+
+    Raises:
+        ValueError if k is not positive or no k entries in numbers sums to
+        target.
+
+    >>> find_k_entry_product([1, 2, 3, 4, 5], 4, target=14)
+    120
+    """
+    if k < 1:
+        raise ValueError(f'k must be positive, got: {k}')
+    numbers = list(numbers)
+    table_size = k // 2
+    search_size = k - table_size
+
+    table = {}
+    for table_indices in itertools.combinations(
+            range(len(numbers)), table_size):
+        table_sum = sum(numbers[index] for index in table_indices)
+        table.setdefault(table_sum, []).append(table_indices)
+
+    for search_indices in itertools.combinations(
+            range(len(numbers)), search_size):
+        search_sum = sum(numbers[index] for index in search_indices)
+        for table_indices in table.get(target - search_sum, ()):
+            if set(table_indices).isdisjoint(search_indices):
+                return math.prod(
+                    numbers[index] for index in search_indices + table_indices)
+    raise ValueError(f'No {k} entries in numbers sums to {target}')
+
+
+def find_subset_sum(numbers, target=2020, checkpoint_interval=None):
+    """
+    Given the list of numbers, return a subset of them of any size that sums
+    to target.
+
+    The sums reachable by subsets of the numbers are tracked as the set bits
+    of a Python int, so adding a number to the candidate subsets is a single
+    shift and or. To recover the subset, the reachable sums are saved every
+    checkpoint_interval numbers and the sums in between are recomputed a
+    block at a time while walking back through the numbers. This takes
+    O(n * target / w) time for a machine word size of w, and memory for
+    O(sqrt(n)) bit sets of target bits by default.
+
+    numbers (iterable): Non-negative integers.
+    target (int): The non-negative value the subset should sum to.
+    checkpoint_interval (int): The number of numbers between saved bit sets.
+    Defaults to the square root of the number of numbers.
+
+    Return (list): Entries of numbers, in report order, which sum to target.
+
+    Raises:
+        ValueError if an entry or target is negative or no subset of numbers
+        sums to target.
+
+    >>> find_subset_sum([1721, 979, 366, 299, 675, 1456])
+    [1721, 299]
+    >>> find_subset_sum([3, 34, 4, 12, 5, 2], target=9)
+    [4, 5]
+    """
+    numbers = list(numbers)
+    if target < 0:
+        raise ValueError(f'The target must not be negative, got: {target}')
+    for number in numbers:
+        if number < 0:
+            raise ValueError(f'Entries must not be negative, got: {number}')
+    if checkpoint_interval is None:
+        checkpoint_interval = max(1, math.isqrt(len(numbers)))
+    elif checkpoint_interval < 1:
+        raise ValueError(
+            f'checkpoint_interval must be positive, got: {checkpoint_interval}')
+
+    # Sums above the target can never be part of a solution.
+    mask = (1 << (target + 1)) - 1
+    checkpoints = []
+    reachable = 1
+    used_count = 0
+    while not reachable >> target & 1:
+        if used_count == len(numbers):
+            raise ValueError(f'No subset of numbers sums to {target}')
+        if used_count % checkpoint_interval == 0:
+            checkpoints.append(reachable)
+        # Entries above the target cannot be used, and shifting by them would
+        # build a needlessly huge int before masking.
+        if numbers[used_count] <= target:
+            reachable = (reachable | reachable << numbers[used_count]) & mask
+        used_count += 1
+
+    subset = []
+    remaining = target
+    block_end = used_count
+    for block in reversed(range(len(checkpoints))):
+        block_start = block * checkpoint_interval
+        # reachable_before[i] holds the sums reachable before numbers[i].
+        reachable_before = [checkpoints[block]]
+        for number in numbers[block_start:block_end - 1]:
+            reachable = reachable_before[-1]
+            if number <= target:
+                reachable = (reachable | reachable << number) & mask
+            reachable_before.append(reachable)
+        for index in reversed(range(block_start, block_end)):
+            if not reachable_before[index - block_start] >> remaining & 1:
+                # The remaining sum is only reachable using this number.
+                remaining -= numbers[index]
+                subset.append(numbers[index])
+        block_end = block_start
+    subset.reverse()
+    return subset
+
+
+def _file_signature(file):
+    """
+    Return the (device, inode, size, modification time in nanoseconds) of
+    the regular file open as file, which identifies the file and version an
+    index was built from, or None if file is not a regular file, as for
+    stdin.
+    """
+    try:
+        status = os.fstat(file.fileno())
+    except (AttributeError, OSError, ValueError):
+        return None
+    if not stat.S_ISREG(status.st_mode):
+        return None
+    return (status.st_dev, status.st_ino, status.st_size,
+            status.st_mtime_ns)
+
+
+class ReportIndex:
+    """
+    An index over an expense report for answering two and three entry
+    queries for many targets.
+
+    The index holds the report's entries as a sorted array along with the sum
+    of every pair of entries, sorted, and the indices of the entries making up
+    each pair. A two entry query is a binary search of the pair sums and a
+    three entry query is a vectorized binary search of the pair sums for the
+    complement of every entry.
+
+    The index is saved as a .npz file. When built from a regular file, the
+    file's identity, size and modification time are saved too so that the
+    index can be checked against the file later.
+    """
+
+    _SUFFIX = '.npz'
+
+    def __init__(self, values, pair_sums, pair_firsts, pair_seconds,
+                 source=None):
+        """
+        Initialize the index from its arrays. Use build or load to create an
+        index.
+
+        values (numpy array): The sorted report entries.
+        pair_sums (numpy array): The sorted sums of every pair of entries.
+        pair_firsts (numpy array): The index in values of the first entry of
+        each pair.
+        pair_seconds (numpy array): The index in values of the second entry of
+        each pair.
+        source (tuple of int): The identity, size and modification time of the
+        file the index was built from, if known.
+        """
+        self._source = source
+        self._values = values
+        self._pair_sums = pair_sums
+        self._pair_firsts = pair_firsts
+        self._pair_seconds = pair_seconds
+
+    @classmethod
+    def get_path(cls, path):
+        """
+        Return the path an index saved to, or loaded from, path is stored at.
+
+        NumPy appends .npz to the names of saved archives, so it is added here
+        when missing so that saving, loading and checking for an existing
+        index all use the same file.
+
+        path (str): The path of the index, with or without the suffix.
+
+        Return (str): The path ending in .npz.
+
+        >>> ReportIndex.get_path('report_index')
+        'report_index.npz'
+        >>> ReportIndex.get_path('report_index.npz')
+        'report_index.npz'
+        """
+        return path if path.endswith(cls._SUFFIX) else path + cls._SUFFIX
+
+    @classmethod
+    def build(cls, numbers, source=None):
+        """
+        Build an index over the given report entries.
+
+        numbers (iterable): Integers.
+        source (file): The open expense report file numbers were read from,
+        if any, recorded so the index can later be checked against it.
+
+        Return (ReportIndex): The index over numbers.
+
+        Raises:
+            RuntimeError if NumPy is not installed.
+
+        >>> index = ReportIndex.build([1721, 979, 366, 299, 675, 1456])
+        >>> index.find_two_entry_product(2020)
+        514579
+        >>> index.find_three_entry_product(2020)
+        241861950
+        """
+        if np is None:
+            raise RuntimeError('NumPy is required to build a ReportIndex.')
+        values = np.sort(np.fromiter(numbers, dtype=np.int64))
+        pair_firsts, pair_seconds = np.triu_indices(len(values), 1)
+        pair_sums = values[pair_firsts] + values[pair_seconds]
+        order = np.argsort(pair_sums, kind='stable')
+        # Report indices fit in 32 bits for any report whose pairs fit in
+        # memory.
+        return cls(values, pair_sums[order],
+                   pair_firsts[order].astype(np.int32),
+                   pair_seconds[order].astype(np.int32),
+                   None if source is None else _file_signature(source))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index previously saved to @a path.
+
+        path (str): The file the index was saved to, with or without the .npz
+        suffix.
+
+        Return (ReportIndex): The loaded index.
+        """
+        if np is None:
+            raise RuntimeError('NumPy is required to load a ReportIndex.')
+        with np.load(cls.get_path(path)) as arrays:
+            source = None
+            if 'source' in arrays:
+                source = tuple(arrays['source'].tolist())
+            return cls(arrays['values'], arrays['pair_sums'],
+                       arrays['pair_firsts'], arrays['pair_seconds'], source)
+
+    def save(self, path):
+        """
+        Save the index to @a path.
+
+        path (str): The file to save the index to. The .npz suffix is added
+        if it is missing.
+        """
+        arrays = {'values': self._values, 'pair_sums': self._pair_sums,
+                  'pair_firsts': self._pair_firsts,
+                  'pair_seconds': self._pair_seconds}
+        if self._source is not None:
+            arrays['source'] = np.array(self._source, dtype=np.int64)
+        np.savez(self.get_path(path), **arrays)
+
+    def is_built_from(self, file):
+        """
+        Determine whether the index was built from the current version of the
+        regular file open as file.
+
+        file (file): The open expense report file.
+
+        Return (bool): Whether the file's identity, size and modification
+        time match those recorded when the index was built.
+        """
+        source = _file_signature(file)
+        return source is not None and source == self._source
+
+    def find_two_entry_product(self, target):
+        """
+        Return the product of two entries that sum to target.
+
+        target (int): The value the two entries should sum to.
+
+        Return (int): The product of two entries that sum to target.
+
+        Raises:
+            ValueError if no two entries sum to target.
+        """
+        position = int(np.searchsorted(self._pair_sums, target))
+        if (position == len(self._pair_sums) or
+                self._pair_sums[position] != target):
+            raise ValueError(f'No two entries in numbers sums to {target}')
+        first = int(self._values[self._pair_firsts[position]])
+        second = int(self._values[self._pair_seconds[position]])
+        return first * second
+
+    def find_three_entry_product(self, target):
+        """
+        Return the product of three entries that sum to target.
+
+        target (int): The value the three entries should sum to.
+
+        Return (int): The product of three entries that sum to target.
+
+        Raises:
+            ValueError if no three entries sum to target.
+        """
+        complements = target - self._values
+        low = np.searchsorted(self._pair_sums, complements, side='left')
+        high = np.searchsorted(self._pair_sums, complements, side='right')
+        candidates = np.flatnonzero(high > low)
+        if len(candidates) == 0:
+            raise ValueError(f'No three entries in numbers sums to {target}')
+
+        # Usually the first pair summing to an entry's complement does not
+        # include the entry itself.
+        first_pairs = low[candidates]
+        disjoint = ((self._pair_firsts[first_pairs] != candidates) &
+                    (self._pair_seconds[first_pairs] != candidates))
+        hits = np.flatnonzero(disjoint)
+        if len(hits):
+            return self._three_entry_product(
+                candidates[hits[0]], first_pairs[hits[0]])
+
+        for candidate in candidates.tolist():
+            for pair in range(low[candidate] + 1, high[candidate]):
+                if candidate not in (self._pair_firsts[pair],
+                                     self._pair_seconds[pair]):
+                    return self._three_entry_product(candidate, pair)
+        raise ValueError(f'No three entries in numbers sums to {target}')
+
+    def _three_entry_product(self, index, pair):
+        """
+        Return the product of the entry at index and the entries of pair.
+        """
+        return (int(self._values[index]) *
+                int(self._values[self._pair_firsts[pair]]) *
+                int(self._values[self._pair_seconds[pair]]))
+
+
+def query_index(args, numbers):
+    """
+    Answer the query in args using a ReportIndex.
+
+    The index is loaded from, or built and saved to, args.index if given and
+    is otherwise built in memory from numbers. Each target in args.targets is
+    printed with its product, or args.target's product is printed if no
+    targets file is given.
+
+    args (argparse.Namespace): The parsed command line arguments.
+    numbers (list): The expense report entries.
+
+    Return (int): The exit code, 1 if a target had no product.
+
+    Raises:
+        ValueError if the index exists and an expense report is given that is
+        not the one the index was built from, or has changed since.
+    """
+    if args.index is not None and os.path.exists(args.index):
+        index = ReportIndex.load(args.index)
+        if (args.expense_report is not None and
+                not index.is_built_from(args.expense_report)):
+            raise ValueError(
+                f'The report index {args.index} was not built from the '
+                f'current {args.expense_report.name}. Remove the index to '
+                f'rebuild it.')
+    else:
+        index = ReportIndex.build(numbers, args.expense_report)
+        if args.index is not None:
+            index.save(args.index)
+
+    if args.three:
+        num_entries = 'three'
+        find_product = index.find_three_entry_product
+    else:
+        num_entries = 'two'
+        find_product = index.find_two_entry_product
+
+    if args.targets is None:
+        try:
+            print(find_product(args.target))
+        except ValueError:
+            print(f'No {num_entries} numbers in the expense report sum to '
+                  f'{args.target}.')
+            return 1
+        return 0
+
+    status = 0
+    for line in args.targets:
+        if not line.strip():
+            continue
+        target = int(line)
+        try:
+            print(f'{target}: {find_product(target)}')
+        except ValueError:
+            print(f'{target}: No {num_entries} numbers in the expense report '
+                  f'sum to {target}.')
+            status = 1
+    return status
 
 
 def main():
     args = parse_args()
 
     numbers = []
-    for line in args.expense_report:
-        number = int(line)
-        if number > 2020:
-            continue
-        numbers.append(number)
+    if args.expense_report is not None:
+        numbers = [int(line) for line in args.expense_report]
+
+    if args.index is not None or args.targets is not None:
+        return query_index(args, numbers)
+
+    if args.subset_sum:
+        try:
+            subset = find_subset_sum(numbers, args.target)
+        except ValueError:
+            print(f'No subset of the expense report sums to {args.target}.')
+            return 1
+        print(' '.join(str(number) for number in subset))
+        return 0
+
+    if args.k is not None:
+        num_entries = args.k
+    else:
+        num_entries = 3 if args.three else 2
 
     try:
-        if args.three:
-            product = find_three_entry_product(numbers)
+        if args.all_products:
+            products = find_three_entry_products(numbers, args.target)
+            print('\n'.join(str(product) for product in products))
+            return 0
+        elif args.numpy:
+            product = find_three_entry_products(
+                numbers, args.target, first_only=True)[0]
+        elif num_entries == 3:
+            product = find_three_entry_product(numbers, args.target)
+        elif num_entries == 2:
+            product = find_two_entry_product(numbers, args.target)
         else:
-            product = find_two_entry_product(numbers)
+            product = find_k_entry_product(numbers, num_entries, args.target)
     except ValueError:
-        num_entries = 'three' if args.three else 'two'
-        print(f'No {num_entries} numbers in the expense report sum to 2020.')
+        print(f'No {num_entries} numbers in the expense report sum to '
+              f'{args.target}.')
         return 1
 
     print(product)
@@ -1,5 +1,16 @@
 import unittest
 from process_report import find_two_entry_product, find_three_entry_product
+from process_report import find_three_entry_products, find_k_entry_product
+from process_report import find_subset_sum, ReportIndex
+from tempfile import TemporaryDirectory
+import os
+import subprocess
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class TestFindTwoEntryProduct(unittest.TestCase):
@@ -25,6 +36,17 @@ class TestFindTwoEntryProduct(unittest.TestCase):
         self.assertEqual(514579, find_two_entry_product([1721, 20, 299]))
         self.assertEqual(514579, find_two_entry_product([20, 1721, 299]))
 
+    def test_duplicate_values(self):
+        self.assertEqual(1020100, find_two_entry_product([1010, 3, 1010]))
+        with self.assertRaises(ValueError):
+            find_two_entry_product([1010, 3])
+
+    def test_target(self):
+        self.assertEqual(30, find_two_entry_product([5, 2, 6], target=11))
+        self.assertEqual(-6, find_two_entry_product([-3, 9, 2], target=-1))
+        with self.assertRaises(ValueError):
+            find_two_entry_product([1721, 299], target=11)
+
 
 class TestFindThreeEntryProduct(unittest.TestCase):
 
@@ -62,6 +84,242 @@ class TestFindThreeEntryProduct(unittest.TestCase):
         self.assertEqual(241861950, find_three_entry_product(
             [20, 979, 366, 675, 13]))
 
+    def test_duplicate_values(self):
+        self.assertEqual(
+            10000000, find_three_entry_product([1000, 10, 1000, 10], target=2010))
+        with self.assertRaises(ValueError):
+            find_three_entry_product([1000, 10, 5], target=2010)
+
+    def test_target(self):
+        self.assertEqual(60, find_three_entry_product([3, 4, 5, 20], target=12))
+        with self.assertRaises(ValueError):
+            find_three_entry_product([979, 366, 675], target=2021)
+
+
+@unittest.skipIf(numpy is None, 'find_three_entry_products requires NumPy')
+class TestFindThreeEntryProducts(unittest.TestCase):
+
+    def test_emptry_report(self):
+        with self.assertRaises(ValueError):
+            find_three_entry_products([])
+
+    def test_none_sum_to_2020(self):
+        with self.assertRaises(ValueError):
+            find_three_entry_products([1, 2, 3, 2014])
+
+    def test_single_triple(self):
+        self.assertEqual([241861950], find_three_entry_products(
+            [20, 979, 13, 366, 675]))
+
+    def test_all_triples(self):
+        self.assertEqual([15, 24], find_three_entry_products(
+            [5, 4, 3, 2, 1], target=9))
+
+    def test_duplicate_values(self):
+        # Each combination of entries is counted, so the two 1000s pair with
+        # each of the two 10s.
+        self.assertEqual([10000000, 10000000], find_three_entry_products(
+            [1000, 10, 1000, 10], target=2010))
+
+    def test_block_sizes(self):
+        numbers = [7, -3, 12, 0, 5, 5, 9, -1, 4, 8, 2, 6]
+        expected = find_three_entry_products(numbers, target=14)
+        for block_size in (1, 2, 3, 5, 100):
+            self.assertEqual(expected, find_three_entry_products(
+                numbers, target=14, block_size=block_size))
+
+    def test_first_matches_three_entry_product(self):
+        numbers = [1, 2, 3, 4, 5]
+        self.assertEqual(
+            find_three_entry_product(numbers, target=9),
+            find_three_entry_products(numbers, target=9)[0])
+
+    def test_first_only(self):
+        numbers = [7, -3, 12, 0, 5, 5, 9, -1, 4, 8, 2, 6]
+        expected = find_three_entry_products(numbers, target=14)[:1]
+        for block_size in (1, 2, 3, 5, 100):
+            self.assertEqual(expected, find_three_entry_products(
+                numbers, target=14, block_size=block_size, first_only=True))
+        with self.assertRaises(ValueError):
+            find_three_entry_products([1, 2, 3, 2014], first_only=True)
+
+
+@unittest.skipIf(numpy is None, 'ReportIndex requires NumPy')
+class TestReportIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ReportIndex.build([1721, 979, 366, 299, 675, 1456])
+
+    def test_emptry_report(self):
+        index = ReportIndex.build([])
+        with self.assertRaises(ValueError):
+            index.find_two_entry_product(2020)
+        with self.assertRaises(ValueError):
+            index.find_three_entry_product(2020)
+
+    def test_two_entry_product(self):
+        self.assertEqual(514579, self.index.find_two_entry_product(2020))
+        self.assertEqual(1721 * 1456, self.index.find_two_entry_product(3177))
+        with self.assertRaises(ValueError):
+            self.index.find_two_entry_product(2021)
+
+    def test_three_entry_product(self):
+        self.assertEqual(241861950, self.index.find_three_entry_product(2020))
+        self.assertEqual(
+            1721 * 979 * 1456, self.index.find_three_entry_product(4156))
+        with self.assertRaises(ValueError):
+            self.index.find_three_entry_product(1)
+
+    def test_entries_above_target(self):
+        index = ReportIndex.build([5000, -2980, 12])
+        self.assertEqual(5000 * -2980, index.find_two_entry_product(2020))
+
+    def test_entries_used_once(self):
+        index = ReportIndex.build([1010, 1000, 10])
+        with self.assertRaises(ValueError):
+            index.find_three_entry_product(2030)
+        self.assertEqual(1010 * 1000 * 10, index.find_three_entry_product(2020))
+
+    def test_save_and_load(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report_index.npz')
+            self.index.save(path)
+            loaded = ReportIndex.load(path)
+            self.assertEqual(514579, loaded.find_two_entry_product(2020))
+            self.assertEqual(241861950, loaded.find_three_entry_product(2020))
+
+    def test_save_and_load_without_suffix(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report_index')
+            self.index.save(path)
+            self.assertTrue(os.path.exists(ReportIndex.get_path(path)))
+            loaded = ReportIndex.load(path)
+            self.assertEqual(514579, loaded.find_two_entry_product(2020))
+
+    def test_is_built_from(self):
+        report_path = 'test/test_reports/example_report.txt'
+        with open(report_path) as report:
+            index = ReportIndex.build([int(line) for line in report], report)
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report_index')
+            index.save(path)
+            loaded = ReportIndex.load(path)
+            with open(report_path) as report:
+                self.assertTrue(loaded.is_built_from(report))
+            reordered_path = 'test/test_reports/reordered_example_report.txt'
+            with open(reordered_path) as report:
+                self.assertFalse(loaded.is_built_from(report))
+
+    def test_command_line_reuses_index(self):
+        script = os.path.join('process_report', 'process_report.py')
+        with TemporaryDirectory() as directory:
+            index_path = os.path.join(directory, 'report_index')
+            targets_path = os.path.join(directory, 'targets.txt')
+            with open(targets_path, 'w') as targets:
+                targets.write('2020\n')
+            report_path = 'test/test_reports/example_report.txt'
+            for report_args in ([report_path], []):
+                result = subprocess.run(
+                    [sys.executable, script, '-i', index_path,
+                     '--targets', targets_path] + report_args,
+                    capture_output=True, text=True)
+                self.assertEqual(0, result.returncode, result.stderr)
+                self.assertEqual('2020: 514579\n', result.stdout)
+
+            # A different report than the index was built from is rejected.
+            result = subprocess.run(
+                [sys.executable, script, '-i', index_path,
+                 'test/test_reports/reordered_example_report.txt'],
+                capture_output=True, text=True)
+            self.assertNotEqual(0, result.returncode)
+            self.assertIn('was not built from', result.stderr)
+
+
+class TestFindKEntryProduct(unittest.TestCase):
+
+    def test_invalid_k(self):
+        with self.assertRaises(ValueError):
+            find_k_entry_product([1, 2, 3], 0)
+
+    def test_too_few_entries(self):
+        with self.assertRaises(ValueError):
+            find_k_entry_product([1000, 1000, 20], 4)
+
+    def test_matches_two_and_three(self):
+        self.assertEqual(514579, find_k_entry_product([1721, 20, 299], 2))
+        self.assertEqual(241861950, find_k_entry_product(
+            [20, 979, 13, 366, 675], 3))
+
+    def test_single_entry(self):
+        self.assertEqual(2020, find_k_entry_product([3, 2020, 5], 1))
+
+    def test_entries_used_once(self):
+        # 505 * 4 sums to 2020, but there is only one 505.
+        with self.assertRaises(ValueError):
+            find_k_entry_product([505, 1, 2, 3], 4)
+        self.assertEqual(505**4, find_k_entry_product([505] * 4 + [1], 4))
+
+    def test_four_to_six_entries(self):
+        numbers = [1, 2, 4, 8, 16, 32, 64]
+        self.assertEqual(1 * 4 * 16 * 64, find_k_entry_product(
+            numbers, 4, target=85))
+        self.assertEqual(1 * 2 * 8 * 16 * 64, find_k_entry_product(
+            numbers, 5, target=91))
+        self.assertEqual(1 * 2 * 4 * 8 * 16 * 64, find_k_entry_product(
+            numbers, 6, target=95))
+        with self.assertRaises(ValueError):
+            find_k_entry_product(numbers, 5, target=85)
+
+
+class TestFindSubsetSum(unittest.TestCase):
+
+    def assertSubsetOf(self, numbers, subset, target):
+        self.assertEqual(target, sum(subset))
+        remaining = list(numbers)
+        for number in subset:
+            remaining.remove(number)
+
+    def test_emptry_report(self):
+        self.assertEqual([], find_subset_sum([], 0))
+        with self.assertRaises(ValueError):
+            find_subset_sum([])
+
+    def test_no_subset(self):
+        with self.assertRaises(ValueError):
+            find_subset_sum([2, 4, 6], target=7)
+
+    def test_negative_values(self):
+        with self.assertRaises(ValueError):
+            find_subset_sum([2, -4, 6], target=2)
+        with self.assertRaises(ValueError):
+            find_subset_sum([2, 4, 6], target=-2)
+
+    def test_entries_used_once(self):
+        with self.assertRaises(ValueError):
+            find_subset_sum([1010], target=2020)
+        self.assertEqual([1010, 1010], find_subset_sum([1010, 7, 1010]))
+
+    def test_subset_sizes(self):
+        numbers = [1, 2, 4, 8, 16, 32, 64, 128]
+        for target in (0, 1, 85, 127, 255):
+            self.assertSubsetOf(numbers, find_subset_sum(numbers, target), target)
+
+    def test_entries_above_target(self):
+        # Entries far above the target are skipped rather than shifted by.
+        self.assertEqual([5, 7], find_subset_sum([5, 10**11, 7], 12))
+        numbers = [10**11, 13, 10**12, 7, 22, 10**11, 5]
+        for checkpoint_interval in (1, 2, 3, 100):
+            subset = find_subset_sum(
+                numbers, 47, checkpoint_interval=checkpoint_interval)
+            self.assertSubsetOf(numbers, subset, 47)
+
+    def test_checkpoint_intervals(self):
+        numbers = [13, 7, 22, 5, 31, 2, 19, 11, 3, 17]
+        for checkpoint_interval in (1, 2, 3, 7, 100):
+            subset = find_subset_sum(
+                numbers, 112, checkpoint_interval=checkpoint_interval)
+            self.assertSubsetOf(numbers, subset, 112)
+
 
 if __name__ == '__main__':
     unittest.main()
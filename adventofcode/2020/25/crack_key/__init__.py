@@ -1 +1,6 @@
 from .crack_key import derive_loop_size, derive_encryption_key
+from .crack_key import derive_loop_size_bsgs
+from .crack_key import build_baby_step_table, load_baby_step_table
+from .crack_key import derive_loop_size_with_table, crack_key_pairs
+from .crack_key import derive_loop_size_pohlig_hellman, factorize
+from .crack_key import derive_first_loop_size
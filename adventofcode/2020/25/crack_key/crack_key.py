@@ -1,10 +1,30 @@
 #!/usr/bin/env python3
 
 import argparse
+import math
+import multiprocessing
+import os
+import random
 import sys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 DIVISOR = 20201227
 
+# The number of giant steps looked up in a baby-step table at a time.
+GIANT_STEP_BATCH_SIZE = 1024
+
+# Pohlig-Hellman solves the discrete log in prime order subgroups no larger
+# than this with baby-step giant-step and uses Pollard's rho for larger ones.
+POLLARD_RHO_THRESHOLD = 1 << 24
+
+# Factoring tries dividing by every number up to this bound before falling
+# back to Pollard's rho.
+TRIAL_DIVISION_LIMIT = 1 << 10
+
 def parse_args():
     parser = argparse.ArgumentParser(
             description='Derive the encryption key from the given public keys.')
@@ -18,27 +38,87 @@ def parse_args():
     parser.add_argument(
             '-d', '--door_subject_number',
             type=int,
-            default=7,
-            help="The door's subject number.")
+            help="The door's subject number. Default: 7")
+
+    parser.add_argument(
+            '-m', '--modulus',
+            type=int,
+            default=DIVISOR,
+            help=f"The value transformations are taken modulo. "
+                 f"Default: {DIVISOR}")
+
+    parser.add_argument(
+            '-a', '--algorithm',
+            choices=sorted(LOOP_SIZE_ALGORITHMS),
+            help="The algorithm used to derive loop sizes. Default: bsgs")
+
+    parser.add_argument(
+            '--check',
+            action='store_true',
+            default=False,
+            help="Derive the loop sizes of both the card and door and verify "
+                 "that they produce the same encryption key. By default only "
+                 "one loop size is derived.")
+
+    parser.add_argument(
+            '-b', '--batch',
+            type=argparse.FileType('rt'),
+            help="Crack every pair of card and door public keys in this "
+                 "file, one whitespace separated pair per line, printing "
+                 "an encryption key per line, or an error for a pair that "
+                 "cannot be cracked. The card's subject number is used for "
+                 "every card.")
+
+    parser.add_argument(
+            '-t', '--table_directory',
+            type=str,
+            help="With --batch, the directory in which baby-step tables are "
+                 "saved and reused between runs. By default the table is "
+                 "built in memory for each run.")
+
+    parser.add_argument(
+            '-j', '--processes',
+            type=int,
+            help="With --batch, the number of processes to crack keys with. "
+                 "Default: the number of CPUs.")
 
     parser.add_argument(
             'card_public_key',
             type=int,
+            nargs='?',
             help="The card's public, cryptographic key.")
     parser.add_argument(
             'door_public_key',
             type=int,
+            nargs='?',
             help="The door's public, cryptographic key.")
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.batch is None and (
+            args.card_public_key is None or args.door_public_key is None):
+        parser.error("Provide the card and door public keys or --batch.")
+    if args.processes is not None and args.processes < 1:
+        parser.error(f"--processes must be positive, got: {args.processes}")
+    if args.batch is not None and (
+            args.algorithm is not None or
+            args.door_subject_number is not None or args.check):
+        parser.error("--batch always uses a baby-step table with the card's "
+                     "subject number, so it does not support --algorithm, "
+                     "--door_subject_number or --check.")
+    if args.algorithm is None:
+        args.algorithm = 'bsgs'
+    if args.door_subject_number is None:
+        args.door_subject_number = 7
+    return args
 
-def derive_loop_size(subject_number, public_key):
+def derive_loop_size(subject_number, public_key, modulus=DIVISOR):
     """
     Given the subject_number and public_key, derive the loop size.
 
     Arguments:
         subject_number (int): The cryptographic subject number.
         public_key (int): The public key.
+        modulus (int): The value the transformations are taken modulo.
 
     Returns (int): The number of iterations performed on the subject number to
     get the public_key.
@@ -47,11 +127,546 @@ def derive_loop_size(subject_number, public_key):
     transformed_value = 1
     while transformed_value != public_key:
         transformed_value *= subject_number
-        transformed_value %= DIVISOR
+        transformed_value %= modulus
         loop_size += 1
     return loop_size
 
-def derive_encryption_key(loop_size, public_key):
+def derive_loop_size_bsgs(subject_number, public_key, modulus=DIVISOR):
+    """
+    Given the subject_number and public_key, derive the loop size using the
+    baby-step giant-step algorithm.
+
+    The first m powers of the subject number, for m just over the square root
+    of the modulus, are tabled as baby steps. Then the public key is
+    repeatedly divided by the subject number to the power m, a giant step,
+    until it lands on a tabled power. This takes O(sqrt(modulus)) time and
+    memory rather than the O(modulus) time of derive_loop_size.
+
+    Arguments:
+        subject_number (int): The cryptographic subject number. It must be
+        coprime with the modulus.
+        public_key (int): The public key.
+        modulus (int): The value the transformations are taken modulo.
+
+    Raises:
+        ValueError if no loop size transforms the subject number into the
+        public key.
+
+    Returns (int): The smallest number of iterations performed on the subject
+    number to get the public_key.
+
+    >>> derive_loop_size_bsgs(7, 5764801)
+    8
+    """
+    step_count = math.isqrt(modulus) + 1
+
+    baby_steps = {}
+    transformed_value = 1 % modulus
+    for exponent in range(step_count):
+        # Keep the smallest exponent so the smallest loop size is found.
+        baby_steps.setdefault(transformed_value, exponent)
+        transformed_value = transformed_value * subject_number % modulus
+
+    try:
+        giant_step = pow(subject_number, -step_count, modulus)
+    except ValueError:
+        raise ValueError(
+            f'Subject number {subject_number} is not invertible modulo {modulus}')
+
+    transformed_value = public_key % modulus
+    for giant_count in range(step_count):
+        exponent = baby_steps.get(transformed_value)
+        if exponent is not None:
+            return giant_count * step_count + exponent
+        transformed_value = transformed_value * giant_step % modulus
+    raise ValueError(
+        f'No loop size transforms {subject_number} into {public_key} '
+        f'modulo {modulus}')
+
+def _is_probable_prime(number):
+    """
+    Return whether number is prime, per the Miller-Rabin test.
+
+    The test is deterministic for numbers below 3.3 * 10**24.
+
+    >>> [n for n in range(20) if _is_probable_prime(n)]
+    [2, 3, 5, 7, 11, 13, 17, 19]
+    """
+    if number < 2:
+        return False
+    bases = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+    for base in bases:
+        if number % base == 0:
+            return number == base
+    odd_part = number - 1
+    twos = 0
+    while odd_part % 2 == 0:
+        odd_part //= 2
+        twos += 1
+    for base in bases:
+        witness = pow(base, odd_part, number)
+        if witness in (1, number - 1):
+            continue
+        for _ in range(twos - 1):
+            witness = witness * witness % number
+            if witness == number - 1:
+                break
+        else:
+            return False
+    return True
+
+def _pollard_rho_factor(number):
+    """
+    Return a non-trivial factor of the odd, composite number using Pollard's
+    rho with Floyd's tortoise and hare cycle finding.
+    """
+    while True:
+        constant = random.randrange(1, number)
+        tortoise = hare = random.randrange(0, number)
+        factor = 1
+        while factor == 1:
+            tortoise = (tortoise * tortoise + constant) % number
+            hare = (hare * hare + constant) % number
+            hare = (hare * hare + constant) % number
+            factor = math.gcd(abs(tortoise - hare), number)
+        if factor != number:
+            return factor
+
+def factorize(number):
+    """
+    Factor number into primes.
+
+    Small factors are found by trial division and any large remaining
+    composite is split with Pollard's rho.
+
+    Arguments:
+        number (int): A positive integer.
+
+    Returns (dict): The exponent of each prime factor of number.
+
+    >>> factorize(20201226)
+    {2: 1, 3: 1, 29: 1, 116099: 1}
+    """
+    factors = {}
+    for divisor in range(2, TRIAL_DIVISION_LIMIT + 1):
+        if divisor * divisor > number:
+            break
+        while number % divisor == 0:
+            factors[divisor] = factors.get(divisor, 0) + 1
+            number //= divisor
+
+    composites = [number] if number > 1 else []
+    while composites:
+        composite = composites.pop()
+        if _is_probable_prime(composite):
+            factors[composite] = factors.get(composite, 0) + 1
+            continue
+        factor = _pollard_rho_factor(composite)
+        composites.extend((factor, composite // factor))
+    return dict(sorted(factors.items()))
+
+def _prime_order_log_bsgs(generator, element, order, modulus):
+    """
+    Solve generator**x == element for generator of prime order, using
+    baby-step giant-step sized to the order rather than the modulus.
+
+    Returns (int): x, or None if element is not a power of generator.
+    """
+    step_count = math.isqrt(order) + 1
+    baby_steps = {}
+    value = 1
+    for exponent in range(step_count):
+        baby_steps.setdefault(value, exponent)
+        value = value * generator % modulus
+    giant_step = pow(generator, -step_count, modulus)
+    value = element
+    for giant_count in range(step_count):
+        exponent = baby_steps.get(value)
+        if exponent is not None:
+            return (giant_count * step_count + exponent) % order
+        value = value * giant_step % modulus
+    return None
+
+def _prime_order_log_rho(generator, element, order, modulus, attempts=32):
+    """
+    Solve generator**x == element for generator of prime order, using
+    Pollard's rho with Floyd's cycle finding in constant memory.
+
+    Returns (int): x, or None if element is not a power of generator.
+    """
+    def step(value, a, b):
+        # Partition on a multiplicative hash of the value rather than the value
+        # modulo 3, which is the same for every element of the subgroup when 3
+        # divides the modulus.
+        partition = (value * 0x9E3779B1 >> 7) % 3
+        if partition == 0:
+            return value * value % modulus, 2 * a % order, 2 * b % order
+        if partition == 1:
+            return value * generator % modulus, (a + 1) % order, b
+        return value * element % modulus, a, (b + 1) % order
+
+    for _ in range(attempts):
+        a = random.randrange(order)
+        b = random.randrange(order)
+        value = pow(generator, a, modulus) * pow(element, b, modulus) % modulus
+        tortoise = (value, a, b)
+        hare = step(*tortoise)
+        while tortoise[0] != hare[0]:
+            tortoise = step(*tortoise)
+            hare = step(*step(*hare))
+        # generator**a1 * element**b1 == generator**a2 * element**b2.
+        exponent_difference = (hare[1] - tortoise[1]) % order
+        element_difference = (tortoise[2] - hare[2]) % order
+        if element_difference == 0:
+            continue
+        log = exponent_difference * pow(element_difference, -1, order) % order
+        if pow(generator, log, modulus) == element:
+            return log
+    return None
+
+def derive_loop_size_pohlig_hellman(subject_number, public_key, modulus=DIVISOR):
+    """
+    Given the subject_number and public_key, derive the loop size using the
+    Pohlig-Hellman algorithm.
+
+    The order of the subject number is factored and a small discrete log is
+    solved for each prime power factor, one base q digit at a time. The
+    digits are found with a small baby-step giant-step table, or with
+    Pollard's rho for primes above POLLARD_RHO_THRESHOLD, and the per factor
+    results are combined with the Chinese remainder theorem. When the order
+    has only small prime factors, as 20201226 does, this is fast and uses
+    almost no memory.
+
+    Arguments:
+        subject_number (int): The cryptographic subject number. It must be
+        coprime with the modulus.
+        public_key (int): The public key.
+        modulus (int): The value the transformations are taken modulo.
+
+    Raises:
+        ValueError if no loop size transforms the subject number into the
+        public key.
+
+    Returns (int): The smallest number of iterations performed on the subject
+    number to get the public_key.
+
+    >>> derive_loop_size_pohlig_hellman(7, 17807724)
+    11
+    """
+    generator = subject_number % modulus
+    element = public_key % modulus
+    if math.gcd(generator, modulus) != 1:
+        raise ValueError(
+            f'Subject number {subject_number} is not invertible modulo {modulus}')
+
+    # The subject number's order divides the size of the multiplicative
+    # group, Euler's totient of the modulus.
+    order = 1
+    for prime, exponent in factorize(modulus).items():
+        order *= (prime - 1) * prime ** (exponent - 1)
+    for prime in factorize(order):
+        while order % prime == 0 and pow(generator, order // prime, modulus) == 1:
+            order //= prime
+
+    loop_size = 0
+    combined_modulus = 1
+    for prime, exponent in factorize(order).items():
+        prime_power = prime ** exponent
+        # Project into the subgroup of order prime_power.
+        sub_generator = pow(generator, order // prime_power, modulus)
+        sub_element = pow(element, order // prime_power, modulus)
+        # digit_generator has order prime.
+        digit_generator = pow(sub_generator, prime ** (exponent - 1), modulus)
+
+        sub_log = 0
+        for digit_index in range(exponent):
+            remainder = sub_element * pow(sub_generator, -sub_log, modulus)
+            digit_element = pow(
+                    remainder % modulus,
+                    prime ** (exponent - 1 - digit_index),
+                    modulus)
+            if prime <= POLLARD_RHO_THRESHOLD:
+                digit = _prime_order_log_bsgs(
+                        digit_generator, digit_element, prime, modulus)
+            else:
+                digit = _prime_order_log_rho(
+                        digit_generator, digit_element, prime, modulus)
+            if digit is None:
+                raise ValueError(
+                    f'No loop size transforms {subject_number} into '
+                    f'{public_key} modulo {modulus}')
+            sub_log += digit * prime ** digit_index
+
+        # Combine with the results so far via the Chinese remainder theorem.
+        adjustment = ((sub_log - loop_size) *
+                      pow(combined_modulus, -1, prime_power)) % prime_power
+        loop_size += combined_modulus * adjustment
+        combined_modulus *= prime_power
+
+    if pow(generator, loop_size, modulus) != element:
+        raise ValueError(
+            f'No loop size transforms {subject_number} into {public_key} '
+            f'modulo {modulus}')
+    return loop_size
+
+# The algorithms that may be used to derive loop sizes, by name.
+LOOP_SIZE_ALGORITHMS = {
+    'iterate': derive_loop_size,
+    'bsgs': derive_loop_size_bsgs,
+    'pohlig_hellman': derive_loop_size_pohlig_hellman,
+}
+
+def build_baby_step_table(subject_number, modulus=DIVISOR):
+    """
+    Build the baby-step table used by derive_loop_size_with_table.
+
+    Arguments:
+        subject_number (int): The cryptographic subject number.
+        modulus (int): The value the transformations are taken modulo. It
+        must be less than 2**63.
+
+    Returns (numpy array): A 2 x n array. Row 0 holds the first
+    isqrt(modulus) + 1 powers of the subject number, sorted and without
+    duplicates, and row 1 holds the smallest exponent producing each.
+    """
+    if np is None:
+        raise RuntimeError('NumPy is required to build a baby-step table.')
+    step_count = math.isqrt(modulus) + 1
+    values = np.empty(step_count, dtype=np.int64)
+    transformed_value = 1 % modulus
+    for exponent in range(step_count):
+        values[exponent] = transformed_value
+        transformed_value = transformed_value * subject_number % modulus
+
+    # A stable sort keeps equal values in exponent order, so the first of each
+    # run of equal values has the smallest exponent.
+    order = np.argsort(values, kind='stable')
+    values = values[order]
+    first = np.ones(len(values), dtype=bool)
+    first[1:] = values[1:] != values[:-1]
+    return np.stack((values[first], order[first].astype(np.int64)))
+
+def load_baby_step_table(directory, subject_number, modulus=DIVISOR):
+    """
+    Load the baby-step table for the subject number and modulus saved in
+    directory, building and saving it first if it does not exist.
+
+    The table is memory mapped so that it is shared between runs and
+    processes rather than copied.
+
+    Arguments:
+        directory (str): The directory tables are saved in.
+        subject_number (int): The cryptographic subject number.
+        modulus (int): The value the transformations are taken modulo.
+
+    Returns (numpy array): The baby-step table, per build_baby_step_table.
+    """
+    if np is None:
+        raise RuntimeError('NumPy is required to load a baby-step table.')
+    path = os.path.join(
+            directory, f'baby_steps_{subject_number}_{modulus}.npy')
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file first so concurrent runs never see a
+        # partial table.
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as table_file:
+            np.save(table_file, build_baby_step_table(subject_number, modulus))
+        os.replace(temporary_path, path)
+    return np.load(path, mmap_mode='r')
+
+def derive_loop_size_with_table(
+        table, subject_number, public_key, modulus=DIVISOR):
+    """
+    Given the subject_number and public_key, derive the loop size using the
+    baby-step giant-step algorithm with a prebuilt baby-step table.
+
+    Giant steps are computed a batch at a time and looked up in the table
+    with a single binary search per batch.
+
+    Arguments:
+        table (numpy array): The table from build_baby_step_table or
+        load_baby_step_table for the subject number and modulus.
+        subject_number (int): The cryptographic subject number. It must be
+        coprime with the modulus.
+        public_key (int): The public key.
+        modulus (int): The value the transformations are taken modulo.
+
+    Raises:
+        ValueError if no loop size transforms the subject number into the
+        public key.
+
+    Returns (int): The smallest number of iterations performed on the subject
+    number to get the public_key.
+
+    >>> table = build_baby_step_table(7)
+    >>> derive_loop_size_with_table(table, 7, 17807724)
+    11
+    """
+    step_count = math.isqrt(modulus) + 1
+    values = table[0]
+    exponents = table[1]
+    try:
+        giant_step = pow(subject_number, -step_count, modulus)
+    except ValueError:
+        raise ValueError(
+            f'Subject number {subject_number} is not invertible modulo {modulus}')
+
+    transformed_value = public_key % modulus
+    for batch_start in range(0, step_count, GIANT_STEP_BATCH_SIZE):
+        batch_end = min(batch_start + GIANT_STEP_BATCH_SIZE, step_count)
+        giant_values = []
+        for _ in range(batch_start, batch_end):
+            giant_values.append(transformed_value)
+            transformed_value = transformed_value * giant_step % modulus
+        giant_values = np.array(giant_values, dtype=np.int64)
+        positions = np.searchsorted(values, giant_values)
+        positions = np.minimum(positions, len(values) - 1)
+        hits = np.flatnonzero(values[positions] == giant_values)
+        if len(hits):
+            giant_count = batch_start + int(hits[0])
+            return giant_count * step_count + int(exponents[positions[hits[0]]])
+    raise ValueError(
+        f'No loop size transforms {subject_number} into {public_key} '
+        f'modulo {modulus}')
+
+# The baby-step table, subject number and modulus used by each process of the
+# pool in crack_key_pairs.
+_worker_state = None
+
+def _initialize_worker(table_source, subject_number, modulus):
+    """
+    Set up a crack_key_pairs worker process, loading the table if
+    table_source names a directory.
+    """
+    global _worker_state
+    if isinstance(table_source, str):
+        table = load_baby_step_table(table_source, subject_number, modulus)
+    else:
+        table = table_source
+    _worker_state = (table, subject_number, modulus)
+
+def _crack_key_pair(key_pair):
+    """
+    Derive the encryption key for a pair of card and door public keys in a
+    crack_key_pairs worker process.
+
+    Returns (int or ValueError): The encryption key, or the error raised if
+    the card public key cannot be produced from the subject number.
+    """
+    table, subject_number, modulus = _worker_state
+    card_public_key, door_public_key = key_pair
+    try:
+        card_loop_size = derive_loop_size_with_table(
+                table, subject_number, card_public_key, modulus)
+    except ValueError as error:
+        return error
+    return derive_encryption_key(card_loop_size, door_public_key, modulus)
+
+def crack_key_pairs(
+        key_pairs, subject_number=7, modulus=DIVISOR,
+        table_directory=None, processes=None):
+    """
+    Derive the encryption key for each pair of card and door public keys.
+
+    The baby-step table is built once, or loaded from table_directory if a
+    previous run saved it there, and the giant-step searches for the keys are
+    spread across a pool of processes.
+
+    Arguments:
+        key_pairs (iterable): (card public key, door public key) tuples.
+        subject_number (int): The cards' cryptographic subject number.
+        modulus (int): The value the transformations are taken modulo.
+        table_directory (str): The directory in which to save and reuse the
+        baby-step table. If None, the table is built in memory.
+        processes (int): The number of processes to use. Defaults to the
+        number of CPUs.
+
+    Returns (list): The encryption key for each pair, in order. A pair whose
+    card public key cannot be produced from the subject number has the
+    ValueError describing that in place of its key, so one bad pair does not
+    abort the rest of the batch.
+    """
+    if table_directory is not None:
+        # Build the table, if needed, before the workers try to load it.
+        load_baby_step_table(table_directory, subject_number, modulus)
+        table_source = table_directory
+    else:
+        table_source = build_baby_step_table(subject_number, modulus)
+
+    with multiprocessing.Pool(
+            processes,
+            initializer=_initialize_worker,
+            initargs=(table_source, subject_number, modulus)) as pool:
+        return pool.map(_crack_key_pair, key_pairs, chunksize=64)
+
+def read_key_pairs(key_file):
+    """
+    Read whitespace separated pairs of card and door public keys, one pair per
+    line, skipping blank lines.
+
+    Arguments:
+        key_file (file): The file to read the key pairs from.
+
+    Raises:
+        ValueError if a line does not hold two integers.
+
+    Returns (list): (card public key, door public key) tuples.
+    """
+    key_pairs = []
+    for line in key_file:
+        fields = line.split()
+        if not fields:
+            continue
+        if len(fields) != 2:
+            raise ValueError(f'Expected a card and door public key: "{line}"')
+        key_pairs.append((int(fields[0]), int(fields[1])))
+    return key_pairs
+
+def derive_first_loop_size(
+        subject_number, card_public_key, door_public_key, modulus=DIVISOR):
+    """
+    Given the subject_number shared by the card and door, derive the loop size
+    of whichever device's public key the transformation reaches first.
+
+    This walks the transformation of the subject number once for both
+    devices, stopping as soon as either public key appears. Only one loop
+    size is needed to derive the encryption key.
+
+    Arguments:
+        subject_number (int): The cryptographic subject number of both the
+        card and door.
+        card_public_key (int): The card's public key.
+        door_public_key (int): The door's public key.
+        modulus (int): The value the transformations are taken modulo.
+
+    Raises:
+        ValueError if neither public key can be reached from the subject
+        number.
+
+    Returns (int, bool): The loop size found, and True if it is the card's
+    loop size or False if it is the door's.
+
+    >>> derive_first_loop_size(7, 5764801, 17807724)
+    (8, True)
+    >>> derive_first_loop_size(7, 17807724, 5764801)
+    (8, False)
+    """
+    card_public_key %= modulus
+    door_public_key %= modulus
+    transformed_value = 1 % modulus
+    # The transformation cycles within modulus steps.
+    for loop_size in range(modulus):
+        if transformed_value == card_public_key:
+            return loop_size, True
+        if transformed_value == door_public_key:
+            return loop_size, False
+        transformed_value = transformed_value * subject_number % modulus
+    raise ValueError(
+        f'Neither {card_public_key} nor {door_public_key} can be produced '
+        f'from {subject_number} modulo {modulus}')
+
+def derive_encryption_key(loop_size, public_key, modulus=DIVISOR):
     """
     Given the loop_size of one device, derive the common encryption key via the
     public key of the other.
@@ -63,36 +678,77 @@ def derive_encryption_key(loop_size, public_key):
         public_key (int): The public key of the alternate device from that of
         the loop_size.
 
+        modulus (int): The value the transformations are taken modulo.
+
     Returns (int): the private encryption key.
     """
-    encryption_key = 1
-    for i in range(loop_size):
-        encryption_key *= public_key
-        encryption_key %= DIVISOR
-    return encryption_key
+    # Transforming the public key loop_size times is modular exponentiation,
+    # which pow does in O(log(loop_size)) multiplications.
+    return pow(public_key, loop_size, modulus)
 
 
 def main():
     args = parse_args()
 
-    card_loop_size = derive_loop_size(
+    if args.batch is not None:
+        key_pairs = read_key_pairs(args.batch)
+        encryption_keys = crack_key_pairs(
+                key_pairs,
+                args.card_subject_number,
+                args.modulus,
+                args.table_directory,
+                args.processes)
+        status = 0
+        for encryption_key in encryption_keys:
+            if isinstance(encryption_key, ValueError):
+                print(f'error: {encryption_key}')
+                status = 1
+            else:
+                print(encryption_key)
+        return status
+
+    derive = LOOP_SIZE_ALGORITHMS[args.algorithm]
+    if not args.check:
+        if (args.algorithm == 'iterate' and
+                args.card_subject_number == args.door_subject_number):
+            loop_size, is_card = derive_first_loop_size(
+                    args.card_subject_number,
+                    args.card_public_key,
+                    args.door_public_key,
+                    args.modulus)
+            other_public_key = (
+                    args.door_public_key if is_card else args.card_public_key)
+        else:
+            loop_size = derive(
+                    args.card_subject_number,
+                    args.card_public_key,
+                    args.modulus)
+            other_public_key = args.door_public_key
+        print(derive_encryption_key(loop_size, other_public_key, args.modulus))
+        return 0
+
+    card_loop_size = derive(
             args.card_subject_number,
-            args.card_public_key)
-    door_loop_size = derive_loop_size(
+            args.card_public_key,
+            args.modulus)
+    door_loop_size = derive(
             args.door_subject_number,
-            args.door_public_key)
+            args.door_public_key,
+            args.modulus)
 
     encryption_key = derive_encryption_key(
             card_loop_size,
-            args.door_public_key)
+            args.door_public_key,
+            args.modulus)
 
     # The encryption key is symetric and therefore should be the same computed
     # using either sets of loops sizes or public keys.
-    encyrption_key_check = derive_encryption_key(
+    encryption_key_check = derive_encryption_key(
             door_loop_size,
-            args.card_public_key)
+            args.card_public_key,
+            args.modulus)
 
-    if encryption_key != encyrption_key_check:
+    if encryption_key != encryption_key_check:
         print(f"Internal computation error: mismatched encryption keys:")
         print(f"  {encryption_key}")
         print(f"  {encryption_key_check}")
@@ -2,6 +2,21 @@
 
 import unittest
 from crack_key import derive_loop_size, derive_encryption_key
+from crack_key import derive_loop_size_bsgs
+from crack_key import build_baby_step_table, load_baby_step_table
+from crack_key import derive_loop_size_with_table, crack_key_pairs
+from crack_key import derive_loop_size_pohlig_hellman, factorize
+from crack_key import derive_first_loop_size
+from crack_key.crack_key import read_key_pairs
+import crack_key.crack_key
+from tempfile import TemporaryDirectory
+import io
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 class TestDeriveLoopSize(unittest.TestCase):
 
@@ -11,6 +26,232 @@ class TestDeriveLoopSize(unittest.TestCase):
     def test_door_example(self):
         self.assertEqual(11, derive_loop_size(7, 17807724))
 
+    def test_modulus(self):
+        self.assertEqual(6, derive_loop_size(3, 729 % 101, 101))
+
+
+class TestDeriveLoopSizeBsgs(unittest.TestCase):
+
+    def test_card_example(self):
+        self.assertEqual(8, derive_loop_size_bsgs(7, 5764801))
+
+    def test_door_example(self):
+        self.assertEqual(11, derive_loop_size_bsgs(7, 17807724))
+
+    def test_zero_loop_size(self):
+        self.assertEqual(0, derive_loop_size_bsgs(7, 1))
+
+    def test_large_loop_size(self):
+        public_key = pow(7, 12345678, 20201227)
+        self.assertEqual(12345678, derive_loop_size_bsgs(7, public_key))
+
+    def test_matches_derive_loop_size(self):
+        modulus = 1009
+        for public_key in range(1, modulus, 37):
+            self.assertEqual(
+                derive_loop_size(11, public_key, modulus),
+                derive_loop_size_bsgs(11, public_key, modulus))
+
+    def test_unreachable_public_key(self):
+        # 2 generates only the quadratic residues modulo 7.
+        with self.assertRaises(ValueError):
+            derive_loop_size_bsgs(2, 3, 7)
+
+    def test_non_invertible_subject_number(self):
+        with self.assertRaises(ValueError):
+            derive_loop_size_bsgs(6, 5, 9)
+
+
+class TestFactorize(unittest.TestCase):
+
+    def test_small_numbers(self):
+        self.assertEqual({}, factorize(1))
+        self.assertEqual({2: 1}, factorize(2))
+        self.assertEqual({2: 3, 3: 2}, factorize(72))
+
+    def test_group_order(self):
+        self.assertEqual(
+            {2: 1, 3: 1, 29: 1, 116099: 1}, factorize(20201226))
+
+    def test_large_prime_factors(self):
+        # Both factors are beyond trial division, so Pollard's rho is needed.
+        self.assertEqual(
+            {1000003: 1, 2147483647: 1}, factorize(1000003 * 2147483647))
+        self.assertEqual({2147483647: 2}, factorize(2147483647**2))
+
+
+class TestDeriveLoopSizePohligHellman(unittest.TestCase):
+
+    def test_card_example(self):
+        self.assertEqual(8, derive_loop_size_pohlig_hellman(7, 5764801))
+
+    def test_door_example(self):
+        self.assertEqual(11, derive_loop_size_pohlig_hellman(7, 17807724))
+
+    def test_zero_loop_size(self):
+        self.assertEqual(0, derive_loop_size_pohlig_hellman(7, 1))
+
+    def test_large_loop_size(self):
+        public_key = pow(7, 12345678, 20201227)
+        self.assertEqual(
+            12345678, derive_loop_size_pohlig_hellman(7, public_key))
+
+    def test_matches_derive_loop_size(self):
+        # 1009 - 1 = 2**4 * 3**2 * 7 exercises prime power digits.
+        modulus = 1009
+        for public_key in range(1, modulus, 37):
+            self.assertEqual(
+                derive_loop_size(11, public_key, modulus),
+                derive_loop_size_pohlig_hellman(11, public_key, modulus))
+
+    def test_subject_number_not_a_generator(self):
+        # 2 has order 3 modulo 7.
+        self.assertEqual(2, derive_loop_size_pohlig_hellman(2, 4, 7))
+        with self.assertRaises(ValueError):
+            derive_loop_size_pohlig_hellman(2, 3, 7)
+
+    def test_composite_modulus(self):
+        modulus = 1009 * 1013
+        public_key = pow(3, 54321, modulus)
+        self.assertEqual(
+            derive_loop_size_bsgs(3, public_key, modulus),
+            derive_loop_size_pohlig_hellman(3, public_key, modulus))
+
+    def test_non_invertible_subject_number(self):
+        with self.assertRaises(ValueError):
+            derive_loop_size_pohlig_hellman(6, 5, 9)
+
+    def test_pollard_rho_subgroups(self):
+        threshold = crack_key.crack_key.POLLARD_RHO_THRESHOLD
+        crack_key.crack_key.POLLARD_RHO_THRESHOLD = 10
+        try:
+            public_key = pow(7, 12345678, 20201227)
+            self.assertEqual(
+                12345678, derive_loop_size_pohlig_hellman(7, public_key))
+        finally:
+            crack_key.crack_key.POLLARD_RHO_THRESHOLD = threshold
+
+    def test_pollard_rho_modulus_divisible_by_three(self):
+        # Every element of the odd order subgroups of 30021 = 3 * 10007 is 1
+        # modulo 3, so the walk must not partition on the value modulo 3.
+        threshold = crack_key.crack_key.POLLARD_RHO_THRESHOLD
+        crack_key.crack_key.POLLARD_RHO_THRESHOLD = 2
+        try:
+            for expected in (1, 2, 1234, 5002, 9999):
+                public_key = pow(7, expected, 30021)
+                loop_size = derive_loop_size_pohlig_hellman(
+                    7, public_key, 30021)
+                self.assertEqual(
+                    derive_loop_size(7, public_key, 30021), loop_size)
+        finally:
+            crack_key.crack_key.POLLARD_RHO_THRESHOLD = threshold
+
+    def test_large_modulus(self):
+        # 2**61 - 1 is prime and 2**61 - 2 factors into small primes.
+        modulus = 2**61 - 1
+        public_key = pow(37, 1234567890123456789, modulus)
+        loop_size = derive_loop_size_pohlig_hellman(37, public_key, modulus)
+        self.assertEqual(public_key, pow(37, loop_size, modulus))
+
+
+@unittest.skipIf(numpy is None, 'Baby-step tables require NumPy')
+class TestBabyStepTable(unittest.TestCase):
+
+    def test_table_keeps_smallest_exponents(self):
+        # 2 has order 3 modulo 7, so the powers repeat.
+        table = build_baby_step_table(2, 7)
+        self.assertEqual([1, 2, 4], table[0].tolist())
+        self.assertEqual([0, 1, 2], table[1].tolist())
+
+    def test_derive_loop_size_with_table(self):
+        table = build_baby_step_table(7)
+        self.assertEqual(8, derive_loop_size_with_table(table, 7, 5764801))
+        self.assertEqual(11, derive_loop_size_with_table(table, 7, 17807724))
+        public_key = pow(7, 12345678, 20201227)
+        self.assertEqual(
+            12345678, derive_loop_size_with_table(table, 7, public_key))
+
+    def test_matches_derive_loop_size(self):
+        modulus = 1009
+        table = build_baby_step_table(11, modulus)
+        for public_key in range(1, modulus, 37):
+            self.assertEqual(
+                derive_loop_size(11, public_key, modulus),
+                derive_loop_size_with_table(table, 11, public_key, modulus))
+
+    def test_unreachable_public_key(self):
+        table = build_baby_step_table(2, 7)
+        with self.assertRaises(ValueError):
+            derive_loop_size_with_table(table, 2, 3, 7)
+
+    def test_saved_table_is_reused(self):
+        with TemporaryDirectory() as directory:
+            table = load_baby_step_table(directory, 7, 1009)
+            self.assertEqual(1, len(os.listdir(directory)))
+            reloaded = load_baby_step_table(directory, 7, 1009)
+            self.assertEqual(table.tolist(), reloaded.tolist())
+            self.assertEqual(
+                build_baby_step_table(7, 1009).tolist(), reloaded.tolist())
+
+
+@unittest.skipIf(numpy is None, 'Batch cracking requires NumPy')
+class TestCrackKeyPairs(unittest.TestCase):
+
+    def setUp(self):
+        self.key_pairs = [(5764801, 17807724), (17807724, 5764801)]
+        for card_loop_size, door_loop_size in ((3, 5), (12345, 678910)):
+            self.key_pairs.append((
+                pow(7, card_loop_size, 20201227),
+                pow(7, door_loop_size, 20201227)))
+        self.expected = [14897079, 14897079, pow(7, 15, 20201227),
+                         pow(7, 12345 * 678910, 20201227)]
+
+    def test_in_memory_table(self):
+        self.assertEqual(
+            self.expected, crack_key_pairs(self.key_pairs, processes=2))
+
+    def test_saved_table(self):
+        with TemporaryDirectory() as directory:
+            self.assertEqual(self.expected, crack_key_pairs(
+                self.key_pairs, table_directory=directory, processes=2))
+            self.assertEqual(self.expected, crack_key_pairs(
+                self.key_pairs, table_directory=directory, processes=2))
+
+    def test_uncrackable_pair(self):
+        key_pairs = [self.key_pairs[0], (0, 5), self.key_pairs[1]]
+        results = crack_key_pairs(key_pairs, processes=2)
+        self.assertEqual(self.expected[0], results[0])
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(self.expected[1], results[2])
+
+    def test_read_key_pairs(self):
+        key_file = io.StringIO('5764801 17807724\n\n1 2\n')
+        self.assertEqual(
+            [(5764801, 17807724), (1, 2)], read_key_pairs(key_file))
+        with self.assertRaises(ValueError):
+            read_key_pairs(io.StringIO('5764801\n'))
+
+
+class TestDeriveFirstLoopSize(unittest.TestCase):
+
+    def test_card_first(self):
+        self.assertEqual(
+            (8, True), derive_first_loop_size(7, 5764801, 17807724))
+
+    def test_door_first(self):
+        self.assertEqual(
+            (8, False), derive_first_loop_size(7, 17807724, 5764801))
+
+    def test_same_keys(self):
+        self.assertEqual(
+            (11, True), derive_first_loop_size(7, 17807724, 17807724))
+
+    def test_unreachable_public_keys(self):
+        # 2 generates only the quadratic residues modulo 7.
+        with self.assertRaises(ValueError):
+            derive_first_loop_size(2, 3, 5, 7)
+        self.assertEqual((2, False), derive_first_loop_size(2, 3, 4, 7))
+
 
 class TestDeriveEncryptionKey(unittest.TestCase):
 
@@ -28,6 +269,18 @@ class TestDeriveEncryptionKey(unittest.TestCase):
             doors_loop_size,
             cards_public_key))
 
+    def test_modulus(self):
+        self.assertEqual(
+            pow(17, 11, 101), derive_encryption_key(11, 17, 101))
+
+    def test_zero_loop_size(self):
+        self.assertEqual(1, derive_encryption_key(0, 17807724))
+
+    def test_large_loop_size(self):
+        self.assertEqual(
+            pow(7, 12345678 * 9876543, 20201227),
+            derive_encryption_key(12345678, pow(7, 9876543, 20201227)))
+
 
 if __name__ == '__name__':
     unittest.main()
@@ -1 +1,7 @@
-from .process_depth import count_increases, IntFileIterator
+from .process_depth import count_increases, IntFileIterator, WindowIncreaseCounter
+from .process_depth import load_depths, save_binary_depths, load_binary_depths
+from .process_depth import count_array_increases
+from .process_depth import count_increases_by_window, format_increase_table
+from .process_depth import follow_increases
+from .process_depth import parallel_count_increases
+from .process_depth import DepthIndex
@@ -1,7 +1,54 @@
 #!/usr/bin/env python3
 
 import argparse
+import asyncio
+import multiprocessing
+import os
+import stat
 import sys
+import warnings
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The number of characters read at a time when following a depth report.
+FOLLOW_READ_SIZE = 1 << 16
+
+# The number of bytes of a depth report counted by each process at a time when
+# counting in parallel.
+PARALLEL_CHUNK_SIZE = 1 << 24
+
+# The on disk format of binary depth files: little endian 32 bit integers.
+BINARY_DEPTH_DTYPE = '<i4'
+
+def parse_window_sizes(description):
+    """
+    Parse a range of window sizes of the form MIN..MAX, inclusive.
+
+    Arguments:
+        description (str): The range description.
+
+    Raises:
+        argparse.ArgumentTypeError if the range is malformed or empty or
+        includes a size below 1.
+
+    Returns (range): The window sizes.
+
+    >>> parse_window_sizes('1..3')
+    range(1, 4)
+    """
+    try:
+        minimum, maximum = (int(bound) for bound in description.split('..'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+                f"Expected a range of the form MIN..MAX, got: '{description}'")
+    if minimum < 1 or maximum < minimum:
+        raise argparse.ArgumentTypeError(
+                f"Expected 1 <= MIN <= MAX, got: '{description}'")
+    return range(minimum, maximum + 1)
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -9,16 +56,141 @@ def parse_args():
     parser.add_argument(
             'depth_report_file',
             type=argparse.FileType('r'),
-            default=sys.stdin,
-            help="The input file containing the depth measurements.")
+            nargs='?',
+            help="The input file containing the depth measurements. "
+                "Default: stdin")
     parser.add_argument(
             '-w', '--window_size',
             type=int,
             default=1,
             help="Using a sliding window of the given size "
                 "to count depth increases. Default: 1")
+    parser.add_argument(
+            '-s', '--window_sizes',
+            type=parse_window_sizes,
+            metavar='MIN..MAX',
+            help="Print a table of the depth increase counts for each of the "
+                "given range of window sizes, computed in a single pass.")
+    parser.add_argument(
+            '-f', '--follow',
+            action='store_true',
+            default=False,
+            help="Keep following the depth report as measurements are "
+                "appended to it, printing the updated increase count. "
+                "Stop with Ctrl-C.")
+    parser.add_argument(
+            '-i', '--interval',
+            type=float,
+            default=1.0,
+            help="With --follow, the number of seconds between checks for "
+                "new measurements. Default: 1.0")
+    parser.add_argument(
+            '-j', '--processes',
+            type=int,
+            help="Count the depth increases using a pool of this many "
+                "processes, each counting a piece of the depth report file.")
+    parser.add_argument(
+            '-x', '--index',
+            type=str,
+            metavar='INDEX_DIRECTORY',
+            help="Answer --query range queries with the depth index saved in "
+                "this directory. If it does not exist, an index for the "
+                "--window_size, or each of --window_sizes, is built from the "
+                "depth report and saved there.")
+    parser.add_argument(
+            '-q', '--query',
+            type=int,
+            nargs=3,
+            action='append',
+            default=[],
+            metavar=('FIRST', 'LAST', 'WINDOW_SIZE'),
+            help="With --index, print the number of increases of the given "
+                "window size between readings FIRST and LAST, 0 based and "
+                "inclusive. May be repeated.")
+    parser.add_argument(
+            '-n', '--numpy',
+            action='store_true',
+            default=False,
+            help="Load the measurements into a NumPy array and count the "
+                "increases with vectorized comparisons.")
+    parser.add_argument(
+            '-b', '--binary',
+            action='store_true',
+            default=False,
+            help="The depth report file holds little endian 32 bit integers, "
+                "as written by --save_binary, rather than text. The file is "
+                "memory mapped and counted with NumPy.")
+    parser.add_argument(
+            '--save_binary',
+            type=str,
+            metavar='BINARY_FILE',
+            help="Also save the measurements as little endian 32 bit "
+                "integers to the given file for fast reloading with --binary.")
+
+    args = parser.parse_args()
+    if args.processes is not None and args.processes < 1:
+        parser.error(f"--processes must be positive, got: {args.processes}")
+    return args
+
+class WindowIncreaseCounter:
+    """
+    Incrementally count how many times a sliding window of numbers increases.
+
+    Only the last @a window_size numbers are kept, in a ring buffer, so each
+    number is processed in O(1) regardless of the window size.
+    """
+
+    def __init__(self, window_size=1):
+        """
+        Arguments:
+            window_size (int): The size of the sliding window.
+
+        Raises:
+            ValueError if @a window_size is not positive.
+        """
+        if window_size < 1:
+            raise ValueError(f"window_size must be positive, got: {window_size}")
+        self._window = deque(maxlen=window_size)
+        self._increase_count = 0
+
+    def process_number(self, number):
+        """
+        Slide the window over @a number, counting an increase if the window's
+        sum grew.
+
+        >>> counter = WindowIncreaseCounter(2)
+        >>> for number in [1, 10, 2, 2, 3, 1]:
+        ...     counter.process_number(number)
+        >>> counter.get_increase_count()
+        2
+        """
+        window = self._window
+        if len(window) == window.maxlen:
+            # Since values after the first in the previous window and before
+            # the last in the current window are the same, they need not be
+            # accounted for. Only the first entry in the previous window needs
+            # to be compared with the last in the current.
+            if number > window[0]:
+                self._increase_count += 1
+        # The deque drops the outgoing first entry as the new one is appended.
+        window.append(number)
+
+    def process_numbers(self, numbers):
+        """
+        Process each of @a numbers, per @a process_number.
+
+        Arguments:
+            numbers (iterable of numbers): The numbers to process.
+        """
+        for number in numbers:
+            self.process_number(number)
+
+    def get_increase_count(self):
+        """
+        Return the number of times the window has increased so far.
+        """
+        return self._increase_count
 
-    return parser.parse_args()
 
 def count_increases(numbers, window_size=1):
     """
@@ -35,25 +207,497 @@ def count_increases(numbers, window_size=1):
     >>> count_increases([1, 10, 2, 2, 3, 1])
     2
     """
-    window = []
+    counter = WindowIncreaseCounter(window_size)
+    counter.process_numbers(numbers)
+    return counter.get_increase_count()
 
-    numbers_seen = 0
-    increase_count = 0
-    for number in numbers:
-        if len(window) > window_size:
-            raise RuntimeError("Logic error: window exceeded the expected size.")
 
-        if len(window) == window_size:
-            # Since values after the first in the previous window and before
-            # the last in the current window are the same, they need not be
-            # accounted for. Only the first entry in the previous window needs
-            # to be compared with the last in the current.
-            if number > window[0]:
-                increase_count += 1
-            window = window[1:]
+def count_increases_by_window(numbers, window_sizes):
+    """
+    Count how many times a sliding window increases in @a numbers for each of
+    @a window_sizes in a single pass.
+
+    Only the last max(@a window_sizes) numbers are kept. Each incoming number
+    is compared with the number each window size before it.
+
+    Arguments:
+        numbers (iterable of numbers): The list of numbers.
+        window_sizes (iterable of int): The sizes of the sliding windows.
+
+    Raises:
+        ValueError if a window size is not positive.
+
+    Returns (dict): The increase count keyed by window size.
+
+    >>> count_increases_by_window([1, 10, 2, 2, 3, 1], range(1, 4))
+    {1: 2, 2: 2, 3: 1}
+    """
+    window_sizes = sorted(set(window_sizes))
+    if not window_sizes:
+        return {}
+    if window_sizes[0] < 1:
+        raise ValueError(
+            f"window sizes must be positive, got: {window_sizes[0]}")
+
+    window = deque(maxlen=window_sizes[-1])
+    increase_counts = [0] * len(window_sizes)
+    for number in numbers:
+        for index, window_size in enumerate(window_sizes):
+            # Sizes are sorted, so no larger window is full yet either.
+            if window_size > len(window):
+                break
+            if number > window[-window_size]:
+                increase_counts[index] += 1
         window.append(number)
-        
-    return increase_count
+    return dict(zip(window_sizes, increase_counts))
+
+
+def format_increase_table(increase_counts):
+    """
+    Format increase counts keyed by window size as a table.
+
+    Arguments:
+        increase_counts (dict): The increase count keyed by window size.
+
+    Returns (str): The table, a header followed by a row per window size.
+
+    >>> print(format_increase_table({1: 7, 3: 5}))
+    window_size increases
+              1         7
+              3         5
+    """
+    rows = ['window_size increases']
+    for window_size, increase_count in increase_counts.items():
+        rows.append(f'{window_size:>11} {increase_count:>9}')
+    return '\n'.join(rows)
+
+
+async def follow_increases(
+        file, counter, interval=1.0, report=print, stop=None):
+    """
+    Follow @a file as numbers are appended to it, feeding each new number to
+    @a counter and reporting the updated increase count.
+
+    Every @a interval seconds, the data appended since the last check is read
+    and its complete lines are processed. Data is never read twice, so the
+    work per new number is constant however large the file grows. A line
+    still being written is held until its newline arrives.
+
+    Arguments:
+        file (file): The text file to follow, positioned where following
+        should start.
+        counter (WindowIncreaseCounter): The incremental window state.
+        interval (float): The number of seconds between checks.
+        report (callable): Called with the increase count whenever it changes
+        and once initially.
+        stop (asyncio.Event): If given, following stops once this is set,
+        after processing the data available at that point.
+
+    Raises:
+        ValueError if a line is not an integer.
+    """
+    partial_line = ''
+    reported_count = None
+    while True:
+        while data := file.read(FOLLOW_READ_SIZE):
+            lines = (partial_line + data).split('\n')
+            partial_line = lines.pop()
+            for line in lines:
+                if line.strip():
+                    counter.process_number(int(line))
+
+        increase_count = counter.get_increase_count()
+        if increase_count != reported_count:
+            report(increase_count)
+            reported_count = increase_count
+
+        if stop is None:
+            await asyncio.sleep(interval)
+        elif stop.is_set():
+            return
+        else:
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+def _line_aligned_ranges(path, chunk_size):
+    """
+    Split the file at @a path into byte ranges of about @a chunk_size bytes
+    which each start at the beginning of a line.
+
+    Returns (list of (int, int)): The start and end offset of each range.
+    """
+    file_size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, 'rb') as report:
+        position = chunk_size
+        while position < file_size:
+            # Move to the start of the next line.
+            report.seek(position)
+            report.readline()
+            position = report.tell()
+            if position >= file_size:
+                break
+            boundaries.append(position)
+            position += chunk_size
+    boundaries.append(file_size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _read_previous_numbers(report, offset, count):
+    """
+    Read up to @a count numbers from the lines of @a report which end before
+    @a offset, the start of a line.
+
+    Returns (list of int): The last @a count numbers before @a offset, or all
+    of them if there are fewer.
+    """
+    block_size = 64 * max(count, 1)
+    while True:
+        block_start = max(0, offset - block_size)
+        report.seek(block_start)
+        lines = report.read(offset - block_start).split(b'\n')
+        if block_start > 0:
+            # The first line may have been cut off.
+            lines = lines[1:]
+        numbers = [int(line) for line in lines if line.strip()]
+        if len(numbers) >= count or block_start == 0:
+            return numbers[max(0, len(numbers) - count):]
+        block_size *= 2
+
+
+def _count_range_increases(task):
+    """
+    Count the window increases whose incoming number lies in a byte range of a
+    depth report file.
+
+    The @a window_size numbers before the range are read first, without
+    counting, so that comparisons across the start of the range are counted
+    exactly once: by the range holding the incoming number.
+
+    Arguments:
+        task (tuple): The path, start offset, end offset and window size.
+
+    Returns (int): The number of increases counted for the range.
+    """
+    path, start, end, window_size = task
+    counter = WindowIncreaseCounter(window_size)
+    with open(path, 'rb') as report:
+        # Filling the window never counts an increase.
+        counter.process_numbers(
+                _read_previous_numbers(report, start, window_size))
+        report.seek(start)
+        counter.process_numbers(
+                int(line) for line in report.read(end - start).split(b'\n')
+                if line.strip())
+    return counter.get_increase_count()
+
+
+def parallel_count_increases(
+        path, window_size=1, processes=None, chunk_size=PARALLEL_CHUNK_SIZE):
+    """
+    Count how many times a sliding window of @a window_size increases in the
+    depth report file at @a path, using a pool of processes.
+
+    The file is split into line aligned byte ranges of about @a chunk_size
+    bytes, the increases in each range are counted by a process of the pool,
+    and the counts are summed.
+
+    Arguments:
+        path (str): The depth report file, with a number on each line.
+        window_size (int): The size of the sliding window.
+        processes (int): The number of processes to use. Defaults to the
+        number of CPUs.
+        chunk_size (int): The approximate number of bytes in each range.
+
+    Raises:
+        ValueError if a line is not an integer.
+
+    Returns (int): The number of times the sliding window increases.
+    """
+    if window_size < 1:
+        raise ValueError(f"window_size must be positive, got: {window_size}")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got: {chunk_size}")
+    tasks = [(path, start, end, window_size)
+             for start, end in _line_aligned_ranges(path, chunk_size)]
+    with multiprocessing.Pool(processes) as pool:
+        return sum(pool.map(_count_range_increases, tasks))
+
+
+def _file_signature(file):
+    """
+    Return the (device, inode, size, modification time in nanoseconds) of
+    the regular file open as @a file, which identifies the file and version
+    an index was built from, or None if @a file is not a regular file, as for
+    stdin.
+    """
+    try:
+        status = os.fstat(file.fileno())
+    except (AttributeError, OSError, ValueError):
+        return None
+    if not stat.S_ISREG(status.st_mode):
+        return None
+    return (status.st_dev, status.st_ino, status.st_size,
+            status.st_mtime_ns)
+
+
+class DepthIndex:
+    """
+    An index of prefix counts of window increases over a depth report for
+    answering range queries in O(1).
+
+    For each indexed window size w, the index holds an array whose entry t is
+    the number of readings before reading t that are greater than the reading
+    w before them. The arrays are saved as .npy files in a directory and
+    memory mapped when loaded. When built from a regular file, the file's
+    identity, size and modification time are saved too so that the index can
+    be checked against the file later.
+    """
+
+    _FILE_PREFIX = 'increases_w'
+    _SOURCE_FILE = 'source.npy'
+
+    def __init__(self, prefix_counts, source=None):
+        """
+        Initialize the index from its arrays. Use build or load to create an
+        index.
+
+        Arguments:
+            prefix_counts (dict): The prefix count array keyed by window size.
+            source (tuple of int): The identity, size and modification time
+            of the file the index was built from, if known.
+        """
+        self._prefix_counts = prefix_counts
+        self._source = source
+
+    @classmethod
+    def build(cls, depths, window_sizes, source=None):
+        """
+        Build an index over @a depths for each of @a window_sizes.
+
+        Arguments:
+            depths (numpy array): The depth readings.
+            window_sizes (iterable of int): The window sizes to index.
+            source (file): The open depth report file @a depths were read
+            from, if any, recorded so the index can later be checked against
+            it.
+
+        Raises:
+            ValueError if a window size is not positive.
+
+        Returns (DepthIndex): The index.
+
+        >>> index = DepthIndex.build(np.array([1, 10, 2, 2, 3, 1]), [1, 2])
+        >>> index.count_increases(0, 5, 1)
+        2
+        >>> index.count_increases(2, 5, 2)
+        1
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required to build a DepthIndex.")
+        # Counts can be no larger than the number of readings.
+        dtype = np.uint32 if len(depths) < 2**32 else np.uint64
+        prefix_counts = {}
+        for window_size in sorted(set(window_sizes)):
+            if window_size < 1:
+                raise ValueError(
+                    f"window sizes must be positive, got: {window_size}")
+            counts = np.zeros(len(depths) + 1, dtype=dtype)
+            if len(depths) > window_size:
+                increases = depths[window_size:] > depths[:-window_size]
+                np.cumsum(increases, out=counts[window_size + 1:])
+            prefix_counts[window_size] = counts
+        return cls(prefix_counts,
+                   None if source is None else _file_signature(source))
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Load an index previously saved to @a directory, memory mapping its
+        arrays.
+
+        Arguments:
+            directory (str): The directory the index was saved to.
+
+        Returns (DepthIndex): The index.
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required to load a DepthIndex.")
+        prefix_counts = {}
+        for name in os.listdir(directory):
+            if name.startswith(cls._FILE_PREFIX) and name.endswith('.npy'):
+                window_size = int(name[len(cls._FILE_PREFIX):-len('.npy')])
+                prefix_counts[window_size] = np.load(
+                        os.path.join(directory, name), mmap_mode='r')
+        source = None
+        source_path = os.path.join(directory, cls._SOURCE_FILE)
+        if os.path.exists(source_path):
+            source = tuple(np.load(source_path).tolist())
+        return cls(dict(sorted(prefix_counts.items())), source)
+
+    def save(self, directory):
+        """
+        Save the index to @a directory, creating it if needed.
+
+        Arguments:
+            directory (str): The directory to save the index to.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for window_size, counts in self._prefix_counts.items():
+            np.save(os.path.join(
+                    directory, f'{self._FILE_PREFIX}{window_size}.npy'), counts)
+        if self._source is not None:
+            np.save(os.path.join(directory, self._SOURCE_FILE),
+                    np.array(self._source, dtype=np.int64))
+
+    def is_built_from(self, file):
+        """
+        Determine whether the index was built from the current version of the
+        regular file open as @a file.
+
+        Arguments:
+            file (file): The open depth report file.
+
+        Returns (bool): Whether the file's identity, size and modification
+        time match those recorded when the index was built.
+        """
+        source = _file_signature(file)
+        return source is not None and source == self._source
+
+    def get_window_sizes(self):
+        """
+        Return the indexed window sizes.
+
+        Returns (list of int): The window sizes, in ascending order.
+        """
+        return list(self._prefix_counts)
+
+    def count_increases(self, first, last, window_size=1):
+        """
+        Count how many times a sliding window of @a window_size increases
+        between readings @a first and @a last, inclusive.
+
+        Only windows made up entirely of readings in the range are compared,
+        so this matches count_increases over depths[first:last + 1].
+
+        Arguments:
+            first (int): The 0 based index of the first reading.
+            last (int): The 0 based index of the last reading.
+            window_size (int): The size of the sliding window. It must have
+            been indexed.
+
+        Raises:
+            ValueError if @a window_size was not indexed.
+            IndexError if the range is not within the readings.
+
+        Returns (int): The number of times the sliding window increases.
+        """
+        counts = self._prefix_counts.get(window_size)
+        if counts is None:
+            raise ValueError(f"Window size {window_size} is not indexed.")
+        if not 0 <= first <= last < len(counts) - 1:
+            raise IndexError(
+                f"Readings {first} to {last} are not within the "
+                f"{len(counts) - 1} readings.")
+        # The first increase compares reading first + window_size with
+        # reading first.
+        if first + window_size > last:
+            return 0
+        return int(counts[last + 1]) - int(counts[first + window_size])
+
+
+def load_depths(file):
+    """
+    Load a file with a number on each line into a NumPy array.
+
+    Each line is parsed as a single column, so, as with IntFileIterator, a
+    line holding several numbers is rejected rather than read as several
+    depths.
+
+    Arguments:
+        file (file or str): The file, or path to the file, to read.
+
+    Raises:
+        ValueError if a line holds something other than a single integer.
+
+    Returns (numpy array): The numbers as 64 bit integers.
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required to load depths into an array.")
+    with warnings.catch_warnings():
+        # An empty file only warns that it holds no data.
+        warnings.simplefilter('ignore', UserWarning)
+        depths = np.loadtxt(file, dtype=np.int64, delimiter=',',
+                            comments=None, ndmin=2)
+    if depths.shape[1] != 1:
+        raise ValueError("Expected a single depth on each line.")
+    return depths.ravel()
+
+
+def save_binary_depths(depths, path):
+    """
+    Save the depths to @a path as little endian 32 bit integers.
+
+    Arguments:
+        depths (numpy array or iterable of numbers): The depths to save.
+        path (str): The file to write.
+
+    Raises:
+        ValueError if a depth does not fit in 32 bits.
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required to save binary depths.")
+    depths = np.asarray(depths, dtype=np.int64)
+    limits = np.iinfo(BINARY_DEPTH_DTYPE)
+    if len(depths) and (depths.min() < limits.min or depths.max() > limits.max):
+        raise ValueError("Depths must fit in 32 bit integers.")
+    depths.astype(BINARY_DEPTH_DTYPE).tofile(path)
+
+
+def load_binary_depths(path):
+    """
+    Memory map a file of depths written by @a save_binary_depths.
+
+    Arguments:
+        path (str): The file to map.
+
+    Returns (numpy array): The depths.
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required to load binary depths.")
+    with open(path, 'rb') as binary_file:
+        if not binary_file.read(1):
+            # Empty files cannot be memory mapped.
+            return np.empty(0, dtype=BINARY_DEPTH_DTYPE)
+    return np.memmap(path, dtype=BINARY_DEPTH_DTYPE, mode='r')
+
+
+def count_array_increases(depths, window_size=1):
+    """
+    Count how many times a sliding window of @a window_size increases in the
+    array @a depths.
+
+    This produces the same result as @a count_increases, but compares every
+    number with the number @a window_size before it in a single vectorized
+    operation.
+
+    Arguments:
+        depths (numpy array): The numbers.
+        window_size (int): The size of the sliding window.
+
+    Returns (int): The number of times the sliding window increases.
+
+    >>> count_array_increases(np.array([1, 10, 2, 2, 3, 1]))
+    2
+    """
+    if window_size < 1:
+        raise ValueError(f"window_size must be positive, got: {window_size}")
+    if len(depths) <= window_size:
+        return 0
+    return int(np.count_nonzero(depths[window_size:] > depths[:-window_size]))
 
 
 def IntFileIterator(file):
@@ -65,9 +709,77 @@ def IntFileIterator(file):
 
 def main():
     args = parse_args()
-    depth_iterator = IntFileIterator(args.depth_report_file)
-    depth_increase_count = count_increases(depth_iterator, args.window_size)
-    print(depth_increase_count)
+    index = None
+    if args.index is not None and os.path.isdir(args.index):
+        index = DepthIndex.load(args.index)
+        if (args.depth_report_file is not None and
+                not index.is_built_from(args.depth_report_file)):
+            raise ValueError(
+                f"The depth index in {args.index} was not built from the "
+                f"current {args.depth_report_file.name}. Remove the index to "
+                f"rebuild it.")
+    if args.depth_report_file is None:
+        args.depth_report_file = sys.stdin
+
+    if args.follow:
+        counter = WindowIncreaseCounter(args.window_size)
+        try:
+            asyncio.run(follow_increases(
+                    args.depth_report_file,
+                    counter,
+                    args.interval,
+                    lambda increase_count: print(increase_count, flush=True)))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.index is not None:
+        if index is None:
+            if args.binary:
+                depths = load_binary_depths(args.depth_report_file.name)
+            else:
+                depths = load_depths(args.depth_report_file)
+            index = DepthIndex.build(
+                    depths, args.window_sizes or [args.window_size],
+                    args.depth_report_file)
+            index.save(args.index)
+        for first, last, window_size in args.query:
+            print(index.count_increases(first, last, window_size))
+        return 0
+
+    if args.processes is not None:
+        print(parallel_count_increases(
+                args.depth_report_file.name,
+                args.window_size,
+                args.processes))
+        return 0
+
+    if args.binary:
+        depths = load_binary_depths(args.depth_report_file.name)
+    elif args.numpy or args.save_binary:
+        depths = load_depths(args.depth_report_file)
+    elif args.window_sizes:
+        depth_iterator = IntFileIterator(args.depth_report_file)
+        increase_counts = count_increases_by_window(
+                depth_iterator, args.window_sizes)
+        print(format_increase_table(increase_counts))
+        return 0
+    else:
+        depth_iterator = IntFileIterator(args.depth_report_file)
+        depth_increase_count = count_increases(depth_iterator, args.window_size)
+        print(depth_increase_count)
+        return 0
+
+    if args.save_binary:
+        save_binary_depths(depths, args.save_binary)
+    if args.window_sizes:
+        increase_counts = {
+                window_size: count_array_increases(depths, window_size)
+                for window_size in args.window_sizes}
+        print(format_increase_table(increase_counts))
+    else:
+        print(count_array_increases(depths, args.window_size))
+    return 0
 
 if __name__ == '__main__':
     import doctest
@@ -13,6 +13,8 @@ fail()
 
 [ `python3 ${script} ${input}` -eq 1713 ] || fail "Expected 1713 with a window of 1"
 [ `python3 ${script} -w3 ${input}` -eq 1734 ] || fail "Expected 1734 with a window of 3"
+[ `python3 ${script} -j2 -w3 ${input}` -eq 1734 ] || fail "Expected 1734 with 2 processes"
+python3 ${script} -j0 ${input} 2>/dev/null && fail "Expected -j0 to be rejected"
 
 echo "All tests pass."
 exit 0
@@ -1,9 +1,23 @@
 #!/usr/bin/env python3
 
-from process_depth import count_increases, IntFileIterator
-from tempfile import NamedTemporaryFile
+from process_depth import count_increases, IntFileIterator, WindowIncreaseCounter
+from process_depth import load_depths, save_binary_depths, load_binary_depths
+from process_depth import count_array_increases
+from process_depth import count_increases_by_window, format_increase_table
+from process_depth import follow_increases, parallel_count_increases
+from process_depth import DepthIndex
+from process_depth.process_depth import parse_window_sizes
+import argparse
+import asyncio
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+import os
 import unittest
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 class TestCountIncreasesWindowSize1(unittest.TestCase):
     """
     Test count_increases with a window size of 1 (the default).
@@ -28,6 +42,28 @@ class TestCountWindowIncreases(unittest.TestCase):
         l = [199, 200, 208, 210, 200, 207, 240, 269, 260, 263]
         self.assertEqual(5, count_increases(l, 3))
 
+    def test_large_window(self):
+        l = list(range(10)) + list(range(10))
+        # Each of the last nine values exceeds the value 11 before it.
+        self.assertEqual(9, count_increases(l, 11))
+        self.assertEqual(0, count_increases(l, len(l)))
+
+    def test_invalid_window_size(self):
+        with self.assertRaises(ValueError):
+            count_increases([1, 2, 3], 0)
+
+class TestWindowIncreaseCounter(unittest.TestCase):
+    """
+    Test the incremental WindowIncreaseCounter.
+    """
+    def test_incremental_counts(self):
+        counter = WindowIncreaseCounter(3)
+        l = [199, 200, 208, 210, 200, 207, 240, 269, 260, 263]
+        counter.process_numbers(l[:4])
+        self.assertEqual(1, counter.get_increase_count())
+        counter.process_numbers(iter(l[4:]))
+        self.assertEqual(5, counter.get_increase_count())
+
 class TestIntFileIterator(unittest.TestCase):
     """
     Test the IntFileIterator.
@@ -45,6 +81,256 @@ class TestIntFileIterator(unittest.TestCase):
         for i, file_int in enumerate(file_ints):
             self.assertEqual(input_list[i], file_int)
 
+class TestCountIncreasesByWindow(unittest.TestCase):
+    """
+    Test counting increases for many window sizes at once.
+    """
+    def test_matches_count_increases(self):
+        l = [-30, -40, -20, -5, 0, 3, 2, -1, 5, 8, 7, 8, 8, 6]
+        increase_counts = count_increases_by_window(iter(l), range(1, 16))
+        self.assertEqual(list(range(1, 16)), list(increase_counts))
+        for window_size, increase_count in increase_counts.items():
+            self.assertEqual(count_increases(l, window_size), increase_count)
+
+    def test_unordered_window_sizes(self):
+        l = [199, 200, 208, 210, 200, 207, 240, 269, 260, 263]
+        self.assertEqual(
+            {1: 7, 3: 5}, count_increases_by_window(l, [3, 1, 3]))
+
+    def test_invalid_window_size(self):
+        with self.assertRaises(ValueError):
+            count_increases_by_window([1, 2, 3], [0, 1])
+
+    def test_format_increase_table(self):
+        self.assertEqual(
+            'window_size increases\n'
+            '          1         7\n'
+            '         10         0',
+            format_increase_table({1: 7, 10: 0}))
+
+    def test_parse_window_sizes(self):
+        self.assertEqual(range(2, 6), parse_window_sizes('2..5'))
+        self.assertEqual(range(3, 4), parse_window_sizes('3..3'))
+        for description in ('5', '0..3', '4..2', 'a..b'):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_window_sizes(description)
+
+class TestFollowIncreases(unittest.TestCase):
+    """
+    Test following a growing depth report.
+    """
+    def setUp(self):
+        self.test_file = NamedTemporaryFile(mode='w+t')
+
+    def tearDown(self):
+        self.test_file.close()
+
+    def append(self, text):
+        self.test_file.write(text)
+        self.test_file.flush()
+
+    def test_follow_appended_lines(self):
+        reports = []
+        counter = WindowIncreaseCounter(3)
+
+        async def follow():
+            stop = asyncio.Event()
+            with open(self.test_file.name) as depth_file:
+                task = asyncio.create_task(follow_increases(
+                    depth_file, counter, 0.01, reports.append, stop))
+                await asyncio.sleep(0.05)
+                self.append('199\n200\n208\n210\n')
+                await asyncio.sleep(0.05)
+                # A partial line is held until it is completed.
+                self.append('200\n207\n24')
+                await asyncio.sleep(0.05)
+                self.append('0\n269\n260\n263\n')
+                stop.set()
+                await task
+
+        self.append('')
+        asyncio.run(follow())
+        self.assertEqual([0, 1, 5], reports)
+        self.assertEqual(5, counter.get_increase_count())
+
+    def test_existing_lines_read_once(self):
+        self.append('1\n2\n3\n')
+        reports = []
+        counter = WindowIncreaseCounter()
+
+        async def follow():
+            stop = asyncio.Event()
+            stop.set()
+            with open(self.test_file.name) as depth_file:
+                await follow_increases(
+                    depth_file, counter, 0.01, reports.append, stop)
+
+        asyncio.run(follow())
+        self.assertEqual([2], reports)
+
+class TestParallelCountIncreases(unittest.TestCase):
+    """
+    Test counting increases in pieces of a file with a pool of processes.
+    """
+    def setUp(self):
+        self.test_file = NamedTemporaryFile(mode='w+t')
+        self.depths = [-30, -40, -20, -5, 0, 3, 2, -1, 5, 8, 7, 8, 8, 6] * 5
+        for depth in self.depths:
+            self.test_file.write(f'{depth}\n')
+        self.test_file.flush()
+
+    def tearDown(self):
+        self.test_file.close()
+
+    def test_matches_count_increases(self):
+        for window_size in (1, 3, 10, 69, 70, 100):
+            for chunk_size in (1, 7, 32, 1000):
+                self.assertEqual(
+                    count_increases(self.depths, window_size),
+                    parallel_count_increases(
+                        self.test_file.name, window_size, 2, chunk_size))
+
+    def test_empty_file(self):
+        with NamedTemporaryFile(mode='w+t') as empty_file:
+            self.assertEqual(0, parallel_count_increases(empty_file.name))
+
+    def test_invalid_window_size(self):
+        with self.assertRaises(ValueError):
+            parallel_count_increases(self.test_file.name, 0)
+
+    def test_several_numbers_on_a_line(self):
+        # Like IntFileIterator, only one number is accepted on each line.
+        with NamedTemporaryFile(mode='w+t') as bad_file:
+            bad_file.write('1\n2 3\n4\n')
+            bad_file.flush()
+            with self.assertRaises(ValueError):
+                parallel_count_increases(bad_file.name)
+
+@unittest.skipIf(numpy is None, 'The array functions require NumPy')
+class TestArrayIncreases(unittest.TestCase):
+    """
+    Test the NumPy array based functions.
+    """
+    def setUp(self):
+        self.depths = [199, 200, 208, 210, 200, 207, 240, 269, 260, 263]
+        self.directory = TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_count_array_increases(self):
+        depths = numpy.array(self.depths)
+        self.assertEqual(7, count_array_increases(depths))
+        self.assertEqual(5, count_array_increases(depths, 3))
+        self.assertEqual(0, count_array_increases(depths, len(depths)))
+        self.assertEqual(0, count_array_increases(numpy.array([], dtype=int)))
+
+    def test_matches_count_increases(self):
+        depths = [-30, -40, -20, -5, 0, 3, 2, -1, 5, 8, 7, 8, 8, 6]
+        for window_size in range(1, 6):
+            self.assertEqual(
+                count_increases(depths, window_size),
+                count_array_increases(numpy.array(depths), window_size))
+
+    def test_load_depths(self):
+        path = os.path.join(self.directory.name, 'depths.txt')
+        with open(path, 'w') as depth_file:
+            depth_file.write(''.join(f'{depth}\n' for depth in self.depths))
+        self.assertEqual(self.depths, load_depths(path).tolist())
+
+    def test_load_depths_rejects_invalid(self):
+        path = os.path.join(self.directory.name, 'depths.txt')
+        with open(path, 'w') as depth_file:
+            depth_file.write('1\n2\nthree\n')
+        with self.assertRaises(ValueError):
+            load_depths(path)
+        # Like IntFileIterator, only one number is accepted on each line.
+        for report in ('1\n2 3\n4\n', '1 2\n', '1,2\n', '1\t2\n'):
+            with open(path, 'w') as depth_file:
+                depth_file.write(report)
+            with self.assertRaises(ValueError):
+                load_depths(path)
+
+    def test_binary_round_trip(self):
+        path = os.path.join(self.directory.name, 'depths.bin')
+        save_binary_depths(self.depths, path)
+        self.assertEqual(4 * len(self.depths), os.path.getsize(path))
+        self.assertEqual(self.depths, load_binary_depths(path).tolist())
+
+    def test_empty_binary_file(self):
+        path = os.path.join(self.directory.name, 'depths.bin')
+        save_binary_depths([], path)
+        self.assertEqual(0, len(load_binary_depths(path)))
+
+    def test_save_binary_rejects_large_depths(self):
+        path = os.path.join(self.directory.name, 'depths.bin')
+        with self.assertRaises(ValueError):
+            save_binary_depths([1, 2**31], path)
+
+
+@unittest.skipIf(numpy is None, 'DepthIndex requires NumPy')
+class TestDepthIndex(unittest.TestCase):
+    """
+    Test range queries with the DepthIndex.
+    """
+    def setUp(self):
+        self.depths = [199, 200, 208, 210, 200, 207, 240, 269, 260, 263]
+        self.index = DepthIndex.build(numpy.array(self.depths), [3, 1])
+
+    def test_window_sizes(self):
+        self.assertEqual([1, 3], self.index.get_window_sizes())
+
+    def test_whole_report(self):
+        last = len(self.depths) - 1
+        self.assertEqual(7, self.index.count_increases(0, last))
+        self.assertEqual(5, self.index.count_increases(0, last, 3))
+
+    def test_matches_count_increases(self):
+        for first in range(len(self.depths)):
+            for last in range(first, len(self.depths)):
+                for window_size in (1, 3):
+                    self.assertEqual(
+                        count_increases(
+                            self.depths[first:last + 1], window_size),
+                        self.index.count_increases(first, last, window_size))
+
+    def test_invalid_queries(self):
+        with self.assertRaises(ValueError):
+            self.index.count_increases(0, 5, 2)
+        with self.assertRaises(IndexError):
+            self.index.count_increases(0, len(self.depths))
+        with self.assertRaises(IndexError):
+            self.index.count_increases(5, 4)
+
+    def test_save_and_load(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index')
+            self.index.save(path)
+            loaded = DepthIndex.load(path)
+            self.assertEqual([1, 3], loaded.get_window_sizes())
+            self.assertEqual(4, loaded.count_increases(2, 9, 3))
+
+    def test_is_built_from(self):
+        with TemporaryDirectory() as directory:
+            report_path = os.path.join(directory, 'depths.txt')
+            with open(report_path, 'w') as report:
+                report.write('\n'.join(map(str, self.depths)) + '\n')
+            index_path = os.path.join(directory, 'index')
+            with open(report_path) as report:
+                DepthIndex.build(
+                    numpy.array(self.depths), [1], report).save(index_path)
+
+            loaded = DepthIndex.load(index_path)
+            with open(report_path) as report:
+                self.assertTrue(loaded.is_built_from(report))
+            with open(report_path, 'a') as report:
+                report.write('300\n')
+            with open(report_path) as report:
+                self.assertFalse(loaded.is_built_from(report))
+            # Indexes built without a file cannot be checked against one.
+            with open(report_path) as report:
+                self.assertFalse(self.index.is_built_from(report))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1 +1,3 @@
-from .process_course import Submarine
+from .process_course import (
+        CourseIndex, Submarine, compose_transforms, load_binary_course,
+        parse_course, save_binary_course)
@@ -1,8 +1,46 @@
 #!/usr/bin/env python3
 
 import argparse
+import functools
+import multiprocessing
+import os
+import stat
 import sys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The code each direction is given in parsed courses.
+FORWARD = 0
+DOWN = 1
+UP = 2
+DIRECTION_CODES = {'forward': FORWARD, 'down': DOWN, 'up': UP}
+
+# The number of bytes of a course each process follows at a time when
+# following a course in parallel.
+PARALLEL_CHUNK_SIZE = 1 << 24
+
+# Binary course files start with this magic followed by the number of
+# instructions as a little endian 64 bit integer. The direction codes follow as
+# one byte each, padded to a multiple of four bytes, and then the magnitudes
+# as little endian 32 bit integers.
+BINARY_COURSE_MAGIC = b'SUBCRS01'
+BINARY_COURSE_HEADER_SIZE = len(BINARY_COURSE_MAGIC) + 8
+BINARY_MAGNITUDE_DTYPE = '<i4'
+
+# The default number of instructions between the states saved by a
+# CourseIndex.
+DEFAULT_CHECKPOINT_INTERVAL = 1024
+
+# The direction words parsed by parse_course, by direction code.
+_DIRECTION_WORDS = (b'forward', b'down', b'up')
+
+# The most magnitude digits parsed with vectorized arithmetic. Longer
+# magnitudes could overflow 64 bits.
+_MAX_VECTORIZED_DIGITS = 18
+
 def parse_args():
     parser = argparse.ArgumentParser(
             description="Process the planned submarine course.")
@@ -17,8 +55,419 @@ def parse_args():
             default=False,
             action='store_true',
             help="Use this to follow the old, wrong instructions.")
+    parser.add_argument(
+            "-b", "--batch",
+            default=False,
+            action='store_true',
+            help="Parse the whole course into arrays and evaluate it with "
+                 "NumPy, which is much faster for long courses.")
+    parser.add_argument(
+            "-j", "--processes",
+            type=int,
+            help="Follow the course using a pool of this many processes, "
+                 "each reducing a piece of the course file.")
+    parser.add_argument(
+            "--binary",
+            default=False,
+            action='store_true',
+            help="The course file is a binary course, as written by "
+                 "--save_binary, rather than text. The file is memory mapped "
+                 "and evaluated with NumPy.")
+    parser.add_argument(
+            "--save_binary",
+            type=str,
+            metavar='BINARY_FILE',
+            help="Also save the parsed course as a binary course to the given "
+                 "file for fast reloading with --binary.")
+    parser.add_argument(
+            "-x", "--index",
+            type=str,
+            metavar='INDEX_DIRECTORY',
+            help="Report the submarine's state after each of --steps using a "
+                 "checkpoint index saved in this directory. The index is "
+                 "built from the course if the directory does not exist.")
+    parser.add_argument(
+            "-k", "--steps",
+            type=int,
+            nargs='+',
+            default=[],
+            help="The numbers of instructions after which to report the "
+                 "horizontal position, depth and aim with --index.")
+    parser.add_argument(
+            "--checkpoint_interval",
+            type=int,
+            help="The number of instructions between the states saved when "
+                 f"building an --index. Default: {DEFAULT_CHECKPOINT_INTERVAL}")
+
+    args = parser.parse_args()
+    if args.processes is not None and args.processes < 1:
+        parser.error(f"--processes must be positive, got: {args.processes}")
+    return args
+
+def _parse_instruction(instruction):
+    """
+    Split an instruction into its direction and magnitude.
+
+    Arguments:
+        instruction (str): The desciption of how the submarine should move.
+
+    Raise:
+        ValueError if the instruction does not fit the expected format.
+
+    Return (str, int): The direction and magnitude.
+
+    >>> _parse_instruction('forward 5')
+    ('forward', 5)
+    """
+    split_line = instruction.split()
+    if len(split_line) != 2:
+        raise ValueError(f'Poorly formatted instuction: "{instruction}"')
+
+    direction, magnitude = split_line
+    try:
+        magnitude = int(magnitude)
+    except ValueError:
+        raise ValueError(f'Magnitude in instruction is not an int: "{magnitude}"')
+    return direction, magnitude
+
+def _parse_course_lines(lines):
+    """
+    Parse course lines one at a time, per @a _parse_instruction.
+
+    Arguments:
+        lines: iterable of instruction strings.
+
+    Raise:
+        ValueError if any of the instructions do not fit the expected
+        format.
+
+    Return (numpy array, numpy array): The direction codes and magnitudes.
+    """
+    codes = []
+    magnitudes = []
+    for line in lines:
+        direction, magnitude = _parse_instruction(line)
+        code = DIRECTION_CODES.get(direction)
+        if code is None:
+            raise ValueError(f'Unrecognized direction: "{direction}"')
+        codes.append(code)
+        magnitudes.append(magnitude)
+    limits = np.iinfo(np.int64)
+    # Like follow_instruction, accept magnitudes too large for 64 bits, held
+    # as Python ints.
+    if all(limits.min <= magnitude <= limits.max for magnitude in magnitudes):
+        dtype = np.int64
+    else:
+        dtype = object
+    return (np.array(codes, dtype=np.uint8),
+            np.array(magnitudes, dtype=dtype))
+
+def _parse_course_bytes(course):
+    """
+    Parse a course of the canonical form, a direction word, a single space and
+    the magnitude's digits on each line, with vectorized operations on the
+    course's bytes.
+
+    Each line is classified by its first byte, its direction word and space
+    are compared a column at a time, and its digits are accumulated a column
+    at a time, so the work is a few passes over NumPy arrays rather than a
+    Python loop over the lines.
+
+    Arguments:
+        course (bytes): The course, with an instruction on each line.
+
+    Return (numpy array, numpy array): The direction codes and magnitudes, or
+    None if the course is not entirely in the canonical form.
+    """
+    data = np.frombuffer(course, dtype=np.uint8)
+    newlines = np.flatnonzero(data == ord('\n'))
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(data)]))
+    if len(course) == 0 or course.endswith(b'\n'):
+        # There is no line after the last newline.
+        starts = starts[:-1]
+        ends = ends[:-1]
+    # Allow Windows line endings.
+    carriage_returns = ends > starts
+    carriage_returns[carriage_returns] = (
+            data[ends[carriage_returns] - 1] == ord('\r'))
+    ends = ends - carriage_returns
+
+    codes = np.full(len(starts), len(_DIRECTION_WORDS), dtype=np.uint8)
+    first_bytes = data[np.minimum(starts, max(len(data) - 1, 0))]
+    for code, word in enumerate(_DIRECTION_WORDS):
+        codes[(first_bytes == word[0]) & (ends > starts)] = code
+    if (codes == len(_DIRECTION_WORDS)).any():
+        return None
+
+    word_lengths = np.array([len(word) for word in _DIRECTION_WORDS])
+    digit_starts = starts + word_lengths[codes] + 1
+    digit_counts = ends - digit_starts
+    if len(starts) and (digit_counts.min() < 1 or
+                        digit_counts.max() > _MAX_VECTORIZED_DIGITS):
+        return None
+
+    for code, word in enumerate(_DIRECTION_WORDS):
+        word_starts = starts[codes == code]
+        for column, character in enumerate(word + b' '):
+            if (data[word_starts + column] != character).any():
+                return None
+
+    magnitudes = np.zeros(len(starts), dtype=np.int64)
+    for column in range(int(digit_counts.max()) if len(starts) else 0):
+        in_number = digit_counts > column
+        digits = data[digit_starts[in_number] + column] - np.uint8(ord('0'))
+        # Anything below '0' wraps past 9.
+        if len(digits) and digits.max() > 9:
+            return None
+        magnitudes[in_number] = magnitudes[in_number] * 10 + digits
+    return codes, magnitudes
+
+def parse_course(instructions):
+    """
+    Parse a whole course into a direction code array and a magnitude array.
+
+    Courses in the canonical form, a direction word, a single space and the
+    magnitude's digits on each line, are parsed with vectorized operations
+    on the course's bytes. Anything else, such as extra whitespace or a sign
+    on a magnitude, falls back to parsing line by line, which accepts the
+    same instructions as @a Submarine.follow_instruction and reports the
+    first bad one.
+
+    Arguments:
+        instructions: A course file, the whole course as bytes or a string,
+        or an iterable of instruction strings.
+
+    Raise:
+        ValueError if any of the instructions do not fit the expected
+        format.
+
+    Return (numpy array, numpy array): The uint8 direction codes, per
+    DIRECTION_CODES, and the int64 magnitudes, or Python int magnitudes if
+    any are too large for 64 bits.
+
+    >>> codes, magnitudes = parse_course(['forward 5\\n', 'down 8\\n'])
+    >>> codes.tolist(), magnitudes.tolist()
+    ([0, 1], [5, 8])
+    >>> codes, magnitudes = parse_course(b'up  +3\\n')
+    >>> codes.tolist(), magnitudes.tolist()
+    ([2], [3])
+    """
+    if np is None:
+        raise RuntimeError('NumPy is required to parse a whole course.')
+    if hasattr(instructions, 'buffer'):
+        # Read text files as bytes, skipping decoding.
+        course = instructions.buffer.read()
+    elif hasattr(instructions, 'read'):
+        course = instructions.read()
+    elif isinstance(instructions, (str, bytes)):
+        course = instructions
+    else:
+        course = '\n'.join(map(str.rstrip, instructions))
+    if isinstance(course, str):
+        course = course.encode()
+
+    parsed = _parse_course_bytes(course)
+    if parsed is not None:
+        return parsed
+    lines = course.decode().split('\n')
+    if lines[-1] == '':
+        # There is no line after the last newline.
+        lines.pop()
+    return _parse_course_lines(lines)
+
+def _binary_codes_size(count):
+    """
+    Return the size in bytes of the padded direction code column of a binary
+    course of @a count instructions.
+    """
+    return (count + 3) // 4 * 4
+
+def save_binary_course(codes, magnitudes, path):
+    """
+    Save a parsed course, as produced by parse_course, to @a path in the
+    binary course format. The course is validated here so that it need not be
+    validated when it is loaded.
+
+    Arguments:
+        codes (numpy array): The direction code of each instruction.
+        magnitudes (numpy array): The magnitude of each instruction.
+        path (str): The file to write.
+
+    Raise:
+        ValueError if the columns differ in length, a direction code is not
+        recognized or a magnitude does not fit in 32 bits.
+    """
+    if np is None:
+        raise RuntimeError('NumPy is required to save a binary course.')
+    codes = np.asarray(codes)
+    magnitudes = np.asarray(magnitudes)
+    if len(codes) != len(magnitudes):
+        raise ValueError(
+                f'Course has {len(codes)} directions but '
+                f'{len(magnitudes)} magnitudes.')
+    if len(codes) and (codes.min() < 0 or codes.max() > UP):
+        raise ValueError('Unrecognized direction code in course.')
+    limits = np.iinfo(BINARY_MAGNITUDE_DTYPE)
+    if len(magnitudes) and (magnitudes.min() < limits.min or
+                            magnitudes.max() > limits.max):
+        raise ValueError('Magnitudes must fit in 32 bit integers.')
+
+    padded_codes = np.zeros(_binary_codes_size(len(codes)), dtype=np.uint8)
+    padded_codes[:len(codes)] = codes
+    with open(path, 'wb') as binary_file:
+        binary_file.write(BINARY_COURSE_MAGIC)
+        binary_file.write(len(codes).to_bytes(8, 'little'))
+        padded_codes.tofile(binary_file)
+        magnitudes.astype(BINARY_MAGNITUDE_DTYPE).tofile(binary_file)
+
+def load_binary_course(path):
+    """
+    Memory map a binary course written by @a save_binary_course.
+
+    The returned columns can be passed directly to Submarine.follow_course.
+
+    Arguments:
+        path (str): The file to map.
 
-    return parser.parse_args()
+    Raise:
+        ValueError if the file is not a binary course.
+
+    Return (numpy array, numpy array): The direction codes and magnitudes.
+    """
+    if np is None:
+        raise RuntimeError('NumPy is required to load a binary course.')
+    with open(path, 'rb') as binary_file:
+        header = binary_file.read(BINARY_COURSE_HEADER_SIZE)
+    if (len(header) != BINARY_COURSE_HEADER_SIZE or
+            not header.startswith(BINARY_COURSE_MAGIC)):
+        raise ValueError(f'Not a binary course: "{path}"')
+    count = int.from_bytes(header[len(BINARY_COURSE_MAGIC):], 'little')
+    codes_size = _binary_codes_size(count)
+    expected_size = BINARY_COURSE_HEADER_SIZE + codes_size + 4 * count
+    if os.path.getsize(path) != expected_size:
+        raise ValueError(
+                f'Binary course "{path}" should be {expected_size} bytes long.')
+    if count == 0:
+        # Empty arrays cannot be memory mapped.
+        return (np.empty(0, dtype=np.uint8),
+                np.empty(0, dtype=BINARY_MAGNITUDE_DTYPE))
+
+    codes = np.memmap(path, dtype=np.uint8, mode='r',
+                      offset=BINARY_COURSE_HEADER_SIZE, shape=(count,))
+    magnitudes = np.memmap(path, dtype=BINARY_MAGNITUDE_DTYPE, mode='r',
+                           offset=BINARY_COURSE_HEADER_SIZE + codes_size,
+                           shape=(count,))
+    return codes, magnitudes
+
+def _course_fits_int64(codes, magnitudes):
+    """
+    Determine whether every sum computed while following a parsed course
+    with vectorized evaluation is certain to fit in a 64 bit integer.
+
+    The horizontal position and aim changes are bounded by the sums of the
+    absolute forward and the absolute down and up magnitudes, and the depth
+    change by the product of those sums.
+
+    Arguments:
+        codes (numpy array): The direction code of each instruction.
+        magnitudes (numpy array): The int64 magnitude of each instruction.
+
+    Return (bool): Whether 64 bit arithmetic cannot overflow.
+
+    >>> codes, magnitudes = parse_course(['down 3000000000', 'forward 5'])
+    >>> _course_fits_int64(codes, magnitudes)
+    True
+    >>> codes, magnitudes = parse_course(
+    ...         ['down 3000000000', 'forward 4000000000'])
+    >>> _course_fits_int64(codes, magnitudes)
+    False
+    """
+    if len(magnitudes) == 0:
+        return True
+    limit = np.iinfo(np.int64).max
+    largest = max(int(magnitudes.max()), -int(magnitudes.min()))
+    # This also keeps the sums of absolute magnitudes from overflowing.
+    if largest * len(magnitudes) > limit:
+        return False
+    absolute = np.abs(magnitudes)
+    forward_total = int(absolute[codes == FORWARD].sum())
+    aim_total = int(absolute.sum()) - forward_total
+    return forward_total * aim_total <= limit
+
+def compose_transforms(first, second):
+    """
+    Compose two course transforms into the one transform equivalent to
+    following @a first and then @a second.
+
+    A transform is the (horizontal, depth, aim) reached by a fresh submarine
+    following a piece of a course. Following it from the state (h, d, a)
+    leads to (h + horizontal, d + depth + a * horizontal, a + aim), so the
+    second transform's horizontal movement happens at the aim left by the
+    first. Composition is associative, which lets pieces of a course be
+    reduced independently and then folded in order.
+
+    Arguments:
+        first (tuple of int): The transform of the earlier piece.
+        second (tuple of int): The transform of the later piece.
+
+    Return (tuple of int): The composed transform.
+
+    >>> compose_transforms((5, 0, 5), (8, 40, -3))
+    (13, 80, 2)
+    """
+    horizontal1, depth1, aim1 = first
+    horizontal2, depth2, aim2 = second
+    return (horizontal1 + horizontal2,
+            depth1 + depth2 + aim1 * horizontal2,
+            aim1 + aim2)
+
+def _line_aligned_ranges(path, chunk_size):
+    """
+    Split the file at @a path into byte ranges of about @a chunk_size bytes
+    which each start at the beginning of a line.
+
+    Return (list of (int, int)): The start and end offset of each range.
+    """
+    file_size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, 'rb') as course:
+        position = chunk_size
+        while position < file_size:
+            # Move to the start of the next line.
+            course.seek(position)
+            course.readline()
+            position = course.tell()
+            if position >= file_size:
+                break
+            boundaries.append(position)
+            position += chunk_size
+    boundaries.append(file_size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def _reduce_course_range(task):
+    """
+    Reduce the instructions in a byte range of a course file to a single
+    transform, per @a compose_transforms.
+
+    Arguments:
+        task (tuple): The path, start offset, end offset and whether to follow
+        the old, wrong instructions.
+
+    Return (tuple of int): The transform of the range.
+    """
+    path, start, end, wrong_instructions = task
+    with open(path, 'rb') as course:
+        course.seek(start)
+        instructions = course.read(end - start).decode().splitlines()
+    submarine = Submarine()
+    if wrong_instructions:
+        submarine.follow_wrong_instructions(instructions)
+    else:
+        submarine.follow_instructions(instructions)
+    return (submarine.get_horizontal_position(),
+            submarine.get_depth(),
+            submarine.get_aim())
 
 class Submarine:
 
@@ -52,6 +501,14 @@ class Submarine:
         """
         return self._horizontal_position 
     
+    def get_aim(self):
+        """
+        Return the submarine's aim.
+
+        Return (int): The aim.
+        """
+        return self._aim
+
     def get_position_product(self):
         """
         Return the product of the horizontal position and depth.
@@ -96,15 +553,7 @@ class Submarine:
         >>> s.get_depth()
         8
         """
-        split_line = instruction.split()
-        if len(split_line) != 2:
-            raise ValueError(f'Poorly formatted instuction: "{instruction}"')
-
-        direction, magnitude = split_line
-        try:
-            magnitude = int(magnitude)
-        except ValueError:
-            raise ValueError(f'Magnitude in instruction is not an int: "{magnitude}"')
+        direction, magnitude = _parse_instruction(instruction)
 
         if direction == 'forward':
             self._horizontal_position += magnitude
@@ -182,15 +631,7 @@ class Submarine:
         >>> s.get_depth()
         5
         """
-        split_line = instruction.split()
-        if len(split_line) != 2:
-            raise ValueError(f'Poorly formatted instuction: "{instruction}"')
-
-        direction, magnitude = split_line
-        try:
-            magnitude = int(magnitude)
-        except ValueError:
-            raise ValueError(f'Magnitude in instruction is not an int: "{magnitude}"')
+        direction, magnitude = _parse_instruction(instruction)
 
         if direction == 'forward':
             self._horizontal_position += magnitude
@@ -224,10 +665,477 @@ class Submarine:
         for instruction in instructions:
             self.follow_instruction(instruction)
 
+    def follow_transform(self, transform, wrong_instructions=False):
+        """
+        Move the submarine by a course transform, per @a compose_transforms.
+
+        Arguments:
+            transform (tuple of int): The (horizontal, depth, aim) transform.
+            wrong_instructions (bool): Whether the transform was reduced with
+            the old, wrong rules, under which the aim does not affect depth.
+
+        >>> s = Submarine()
+        >>> s.follow_instruction('down 2')
+        >>> s.follow_transform((3, 1, 4))
+        >>> s.get_horizontal_position(), s.get_depth()
+        (3, 7)
+        """
+        horizontal, depth, aim = transform
+        self._horizontal_position += horizontal
+        self._depth += depth
+        if not wrong_instructions:
+            self._depth += self._aim * horizontal
+        self._aim += aim
+
+    def _follow_instructions_parallel(
+            self, path, processes, chunk_size, wrong_instructions):
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got: {chunk_size}")
+        tasks = [(path, start, end, wrong_instructions)
+                 for start, end in _line_aligned_ranges(path, chunk_size)]
+        with multiprocessing.Pool(processes) as pool:
+            transforms = pool.map(_reduce_course_range, tasks)
+        self.follow_transform(
+                functools.reduce(compose_transforms, transforms, (0, 0, 0)),
+                wrong_instructions)
+
+    def follow_wrong_instructions_parallel(
+            self, path, processes=None, chunk_size=PARALLEL_CHUNK_SIZE):
+        """
+        Follow the course file at @a path the old, incorrect way, using a pool
+        of processes. This produces the same result as
+        @a follow_wrong_instructions.
+
+        The file is split into line aligned byte ranges of about @a chunk_size
+        bytes, each range is reduced to a transform by a process of the pool,
+        and the transforms are composed in order.
+
+        Arguments:
+            path (str): The course file, with an instruction on each line.
+            processes (int): The number of processes to use. Defaults to the
+            number of CPUs.
+            chunk_size (int): The approximate number of bytes in each range.
+
+        Raise:
+            ValueError if any of the instructions do not fit the expected
+            format.
+        """
+        self._follow_instructions_parallel(path, processes, chunk_size, True)
+
+    def follow_instructions_parallel(
+            self, path, processes=None, chunk_size=PARALLEL_CHUNK_SIZE):
+        """
+        Follow the course file at @a path using a pool of processes. This
+        produces the same result as @a follow_instructions.
+
+        The file is split into line aligned byte ranges of about @a chunk_size
+        bytes, each range is reduced to a transform by a process of the pool,
+        and the transforms are composed in order.
+
+        Arguments:
+            path (str): The course file, with an instruction on each line.
+            processes (int): The number of processes to use. Defaults to the
+            number of CPUs.
+            chunk_size (int): The approximate number of bytes in each range.
+
+        Raise:
+            ValueError if any of the instructions do not fit the expected
+            format.
+        """
+        self._follow_instructions_parallel(path, processes, chunk_size, False)
+
+    def follow_course(self, codes, magnitudes, wrong_instructions=False):
+        """
+        Follow a parsed course, as produced by parse_course, with vectorized
+        evaluation.
+
+        The old, wrong rules are masked sums of the magnitudes. For the
+        correct rules, the aim at each step is a cumulative sum of the down
+        and up magnitudes and the depth change is the dot product of the
+        forward magnitudes with the aim at each forward step. This is done with
+        64 bit integers unless the course could overflow them, in which case
+        Python ints are used, as in @a follow_instructions.
+
+        Arguments:
+            codes (numpy array): The direction code of each instruction.
+            magnitudes (numpy array): The magnitude of each instruction.
+            wrong_instructions (bool): Whether to follow the old, wrong rules.
+
+        >>> s = Submarine()
+        >>> s.follow_course(*parse_course(['forward 8', 'down 3', 'forward 2']))
+        >>> s.get_horizontal_position()
+        10
+        >>> s.get_depth()
+        6
+        """
+        magnitudes = np.asarray(magnitudes)
+        if magnitudes.dtype != object:
+            magnitudes = magnitudes.astype(np.int64, copy=False)
+            if not _course_fits_int64(codes, magnitudes):
+                magnitudes = magnitudes.astype(object)
+        forward = codes == FORWARD
+        down = codes == DOWN
+        up = codes == UP
+        self._horizontal_position += int(magnitudes[forward].sum())
+        if wrong_instructions:
+            self._depth += int(magnitudes[down].sum() - magnitudes[up].sum())
+            return
+
+        aim_changes = np.where(down, magnitudes, 0) - np.where(up, magnitudes, 0)
+        # Forward steps do not change the aim, so the aim after each forward
+        # step is the aim it moved with.
+        aims = np.cumsum(aim_changes)
+        self._depth += (self._aim * int(magnitudes[forward].sum()) +
+                        int(np.dot(magnitudes[forward], aims[forward])))
+        if len(aims):
+            self._aim += int(aims[-1])
+
+    def follow_wrong_instructions_batch(self, instructions):
+        """
+        Follow a set of instructions the old, incorrect way, parsing and
+        evaluating them all at once. This produces the same result as
+        @a follow_wrong_instructions.
+
+        Arguments:
+            instructions: iterable of instruction strings.
+
+        Raise:
+            ValueError if any of the instructions do not fit the expected
+            format.
+
+        >>> s = Submarine()
+        >>> s.follow_wrong_instructions_batch(['forward 8', 'down 3'])
+        >>> s.get_depth()
+        3
+        """
+        self.follow_course(*parse_course(instructions), wrong_instructions=True)
+
+    def follow_instructions_batch(self, instructions):
+        """
+        Follow a set of instructions, parsing and evaluating them all at once.
+        This produces the same result as @a follow_instructions.
+
+        Arguments:
+            instructions: iterable of instruction strings.
+
+        Raise:
+            ValueError if any of the instructions do not fit the expected
+            format.
+
+        >>> s = Submarine()
+        >>> s.follow_instructions_batch(['forward 8', 'down 3', 'forward 2'])
+        >>> s.get_depth()
+        6
+        """
+        self.follow_course(*parse_course(instructions))
+
+def _file_signature(file):
+    """
+    Return the (device, inode, size, modification time in nanoseconds) of
+    the regular file open as @a file, which identifies the file and version
+    an index was built from, or None if @a file is not a regular file, as for
+    stdin.
+    """
+    try:
+        status = os.fstat(file.fileno())
+    except (AttributeError, OSError, ValueError):
+        return None
+    if not stat.S_ISREG(status.st_mode):
+        return None
+    return (status.st_dev, status.st_ino, status.st_size,
+            status.st_mtime_ns)
+
+class CourseIndex:
+    """
+    An index of the submarine's state along a course for answering where it
+    is after any number of instructions without following the whole course.
+
+    The (horizontal, depth, aim) state is saved every checkpoint interval
+    instructions. A query starts from the nearest checkpoint at or before it
+    and follows at most an interval of instructions. The course columns and
+    checkpoints are saved as .npy files in a directory and memory mapped when
+    loaded. When built from a regular file, the file's identity, size and
+    modification time are saved too so that the index can be checked against
+    the file later.
+    """
+
+    _FILE_NAMES = ('codes', 'magnitudes', 'checkpoints', 'settings')
+    _SOURCE_FILE = 'source.npy'
+
+    def __init__(self, codes, magnitudes, checkpoints, checkpoint_interval,
+                 wrong_instructions, source=None):
+        """
+        Initialize the index from its arrays. Use build or load to create an
+        index.
+
+        Arguments:
+            codes (numpy array): The direction code of each instruction.
+            magnitudes (numpy array): The magnitude of each instruction.
+            checkpoints (numpy array): The (horizontal, depth, aim) state
+            after each multiple of @a checkpoint_interval instructions.
+            checkpoint_interval (int): The instructions between checkpoints.
+            wrong_instructions (bool): Whether the old, wrong rules are
+            followed.
+            source (tuple of int): The identity, size and modification time
+            of the file the index was built from, if known.
+        """
+        self._codes = codes
+        self._magnitudes = magnitudes
+        self._checkpoints = checkpoints
+        self._checkpoint_interval = checkpoint_interval
+        self._wrong_instructions = wrong_instructions
+        self._source = source
+
+    @classmethod
+    def build(cls, codes, magnitudes,
+              checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL,
+              wrong_instructions=False, source=None):
+        """
+        Build an index over a parsed course, as produced by parse_course.
+
+        The state after every instruction is computed with cumulative sums,
+        as in Submarine.follow_course, and every @a checkpoint_interval'th
+        state is kept.
+
+        Arguments:
+            codes (numpy array): The direction code of each instruction.
+            magnitudes (numpy array): The magnitude of each instruction.
+            checkpoint_interval (int): The instructions between checkpoints.
+            wrong_instructions (bool): Whether to follow the old, wrong rules.
+            source (file): The open course file the course was read from, if
+            any, recorded so the index can later be checked against it.
+
+        Raise:
+            ValueError if @a checkpoint_interval is not positive, or if the
+            states along the course could be too large for the 64 bit
+            integers the checkpoints are saved as.
+
+        Return (CourseIndex): The index.
+
+        >>> course = ['forward 5', 'down 5', 'forward 8', 'up 3', 'forward 2']
+        >>> index = CourseIndex.build(*parse_course(course), 2)
+        >>> index.get_state(3)
+        (13, 40, 5)
+        >>> index.get_state(5)
+        (15, 44, 2)
+        """
+        if np is None:
+            raise RuntimeError('NumPy is required to build a CourseIndex.')
+        if checkpoint_interval < 1:
+            raise ValueError(
+                f'checkpoint_interval must be positive, got: '
+                f'{checkpoint_interval}')
+        codes = np.asarray(codes, dtype=np.uint8)
+        try:
+            magnitudes = np.asarray(magnitudes, dtype=np.int64)
+        except OverflowError:
+            magnitudes = None
+        if magnitudes is None or not _course_fits_int64(codes, magnitudes):
+            raise ValueError(
+                'The states along the course may not fit in 64 bit integers, '
+                'so the course cannot be indexed.')
+        forward = np.where(codes == FORWARD, magnitudes, 0)
+        vertical = (np.where(codes == DOWN, magnitudes, 0) -
+                    np.where(codes == UP, magnitudes, 0))
+
+        # Row i is the state after i instructions.
+        states = np.zeros((len(codes) + 1, 3), dtype=np.int64)
+        np.cumsum(forward, out=states[1:, 0])
+        if wrong_instructions:
+            np.cumsum(vertical, out=states[1:, 1])
+        else:
+            np.cumsum(vertical, out=states[1:, 2])
+            np.cumsum(forward * states[1:, 2], out=states[1:, 1])
+        checkpoints = np.ascontiguousarray(states[::checkpoint_interval])
+        return cls(codes, magnitudes, checkpoints, checkpoint_interval,
+                   wrong_instructions,
+                   None if source is None else _file_signature(source))
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Load an index previously saved to @a directory, memory mapping its
+        arrays.
+
+        Arguments:
+            directory (str): The directory the index was saved to.
+
+        Return (CourseIndex): The index.
+        """
+        if np is None:
+            raise RuntimeError('NumPy is required to load a CourseIndex.')
+        codes, magnitudes, checkpoints, settings = (
+                np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+                for name in cls._FILE_NAMES)
+        checkpoint_interval, wrong_instructions = settings.tolist()
+        source = None
+        source_path = os.path.join(directory, cls._SOURCE_FILE)
+        if os.path.exists(source_path):
+            source = tuple(np.load(source_path).tolist())
+        return cls(codes, magnitudes, checkpoints, checkpoint_interval,
+                   bool(wrong_instructions), source)
+
+    def save(self, directory):
+        """
+        Save the index to @a directory, creating it if needed.
+
+        Arguments:
+            directory (str): The directory to save the index to.
+        """
+        os.makedirs(directory, exist_ok=True)
+        settings = np.array(
+                [self._checkpoint_interval, self._wrong_instructions],
+                dtype=np.int64)
+        arrays = (self._codes, self._magnitudes, self._checkpoints, settings)
+        for name, array in zip(self._FILE_NAMES, arrays):
+            np.save(os.path.join(directory, f'{name}.npy'), array)
+        if self._source is not None:
+            np.save(os.path.join(directory, self._SOURCE_FILE),
+                    np.array(self._source, dtype=np.int64))
+
+    def is_built_from(self, file):
+        """
+        Determine whether the index was built from the current version of the
+        regular file open as @a file.
+
+        Arguments:
+            file (file): The open course file.
+
+        Returns (bool): Whether the file's identity, size and modification
+        time match those recorded when the index was built.
+        """
+        source = _file_signature(file)
+        return source is not None and source == self._source
+
+    def get_checkpoint_interval(self):
+        """
+        Return the number of instructions between the index's checkpoints.
+
+        Return (int): The checkpoint interval.
+        """
+        return self._checkpoint_interval
+
+    def follows_wrong_instructions(self):
+        """
+        Return whether the index follows the old, wrong rules.
+
+        Return (bool): Whether the wrong rules are followed.
+        """
+        return self._wrong_instructions
+
+    def get_num_instructions(self):
+        """
+        Return the number of instructions in the indexed course.
+
+        Return (int): The number of instructions.
+        """
+        return len(self._codes)
+
+    def get_state(self, steps):
+        """
+        Return the submarine's state after following the first @a steps
+        instructions of the course.
+
+        Arguments:
+            steps (int): The number of instructions followed, from 0 to the
+            number of instructions in the course.
+
+        Raise:
+            IndexError if @a steps is not within the course.
+
+        Return (tuple of int): The horizontal position, depth and aim.
+        """
+        if not 0 <= steps <= len(self._codes):
+            raise IndexError(
+                f'Step {steps} is not within the {len(self._codes)} '
+                f'instructions of the course.')
+        checkpoint = steps // self._checkpoint_interval
+        start = checkpoint * self._checkpoint_interval
+        # A fresh submarine following a checkpoint's transform reaches the
+        # checkpoint's state.
+        submarine = Submarine()
+        submarine.follow_transform(
+                tuple(int(value) for value in self._checkpoints[checkpoint]),
+                self._wrong_instructions)
+        if steps > start:
+            submarine.follow_course(
+                    self._codes[start:steps], self._magnitudes[start:steps],
+                    self._wrong_instructions)
+        return (submarine.get_horizontal_position(),
+                submarine.get_depth(),
+                submarine.get_aim())
+
+def query_index(args):
+    """
+    Print the state after each of @a args.steps using the index in
+    @a args.index, building and saving the index first if needed.
+
+    Arguments:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Raise:
+        ValueError if an existing index was not built from the current
+        course file, or with other --wrong_instructions or
+        --checkpoint_interval settings.
+    """
+    if os.path.isdir(args.index):
+        index = CourseIndex.load(args.index)
+        if not index.is_built_from(args.course):
+            raise ValueError(
+                f"The course index in {args.index} was not built from the "
+                f"current {args.course.name}. Remove the index to rebuild "
+                f"it.")
+        if index.follows_wrong_instructions() != args.wrong_instructions:
+            raise ValueError(
+                f"The course index in {args.index} was built "
+                f"{'with' if index.follows_wrong_instructions() else 'without'}"
+                f" --wrong_instructions. Remove the index to rebuild it.")
+        if (args.checkpoint_interval is not None and
+                args.checkpoint_interval != index.get_checkpoint_interval()):
+            raise ValueError(
+                f"The course index in {args.index} was built with a "
+                f"--checkpoint_interval of "
+                f"{index.get_checkpoint_interval()}, not "
+                f"{args.checkpoint_interval}. Remove the index to rebuild "
+                f"it.")
+    else:
+        if args.binary:
+            codes, magnitudes = load_binary_course(args.course.name)
+        else:
+            codes, magnitudes = parse_course(args.course)
+        checkpoint_interval = args.checkpoint_interval
+        if checkpoint_interval is None:
+            checkpoint_interval = DEFAULT_CHECKPOINT_INTERVAL
+        index = CourseIndex.build(
+                codes, magnitudes, checkpoint_interval,
+                args.wrong_instructions, args.course)
+        index.save(args.index)
+    for steps in args.steps:
+        print(*index.get_state(steps))
+
 def main():
     args = parse_args();
+    if args.index is not None:
+        query_index(args)
+        return 0
+
     submarine = Submarine()
-    if args.wrong_instructions:
+    if args.processes is not None:
+        if args.wrong_instructions:
+            submarine.follow_wrong_instructions_parallel(
+                    args.course.name, args.processes)
+        else:
+            submarine.follow_instructions_parallel(
+                    args.course.name, args.processes)
+    elif args.binary:
+        submarine.follow_course(
+                *load_binary_course(args.course.name), args.wrong_instructions)
+    elif args.batch or args.save_binary:
+        codes, magnitudes = parse_course(args.course)
+        if args.save_binary:
+            save_binary_course(codes, magnitudes, args.save_binary)
+        submarine.follow_course(codes, magnitudes, args.wrong_instructions)
+    elif args.wrong_instructions:
         submarine.follow_wrong_instructions(args.course)
     else:
         submarine.follow_instructions(args.course)
@@ -23,5 +23,73 @@ val=`./process_course/process_course.py -w "input.txt"`
 val=`./process_course/process_course.py "input.txt"`
 [ $val -eq 1340836560 ] || fail "Expected 1340836560 from sample input, got: $val"
 
+# The batch evaluator should agree with the line by line one.
+val=`./process_course/process_course.py -b -w "input.txt"`
+[ $val -eq 1499229 ] || fail "Expected 1499229 from batch evaluation, got: $val"
+
+val=`./process_course/process_course.py -b "input.txt"`
+[ $val -eq 1340836560 ] || fail "Expected 1340836560 from batch evaluation, got: $val"
+
+# So should the parallel one.
+val=`./process_course/process_course.py -j 4 -w "input.txt"`
+[ $val -eq 1499229 ] || fail "Expected 1499229 from parallel evaluation, got: $val"
+
+val=`./process_course/process_course.py -j 4 "input.txt"`
+[ $val -eq 1340836560 ] || fail "Expected 1340836560 from parallel evaluation, got: $val"
+
+./process_course/process_course.py -j 0 "input.txt" 2>/dev/null &&
+    fail "Expected --processes 0 to be rejected"
+
+# Convert the course to a binary course and follow that.
+binary_course=`mktemp`
+trap 'rm -f "$binary_course"' EXIT
+val=`./process_course/process_course.py --save_binary "$binary_course" "input.txt"`
+[ $val -eq 1340836560 ] || fail "Expected 1340836560 while saving a binary course, got: $val"
+
+val=`./process_course/process_course.py --binary -w "$binary_course"`
+[ $val -eq 1499229 ] || fail "Expected 1499229 from the binary course, got: $val"
+
+val=`./process_course/process_course.py --binary "$binary_course"`
+[ $val -eq 1340836560 ] || fail "Expected 1340836560 from the binary course, got: $val"
+
+# A course whose magnitudes fit in 32 bits but whose depth does not fit in 64
+# bits must give the same product whichever way it is followed.
+large_input="test/test_input/large_input.txt"
+expected=182236444980616467768235923452
+for options in "" "-b" "-j 2"; do
+    val=`./process_course/process_course.py $options "$large_input"`
+    [ "$val" = "$expected" ] || fail "Expected $expected from the large course with '$options', got: $val"
+done
+
+val=`./process_course/process_course.py --save_binary "$binary_course" "$large_input"`
+[ "$val" = "$expected" ] || fail "Expected $expected while saving the large binary course, got: $val"
+
+val=`./process_course/process_course.py --binary "$binary_course"`
+[ "$val" = "$expected" ] || fail "Expected $expected from the large binary course, got: $val"
+
+val=`./process_course/process_course.py --binary -w "$binary_course"`
+[ "$val" = "31644071537984936962" ] || fail "Expected 31644071537984936962 from the large binary course, got: $val"
+
+# Query the state at the end of the course from a checkpoint index.
+index_directory=`mktemp -d`
+trap 'rm -rf "$binary_course" "$index_directory"' EXIT
+val=`./process_course/process_course.py "input.txt" -x "$index_directory/index" -k 1000`
+[ "$val" = "2007 668080 747" ] || fail "Expected 2007 668080 747 from the index, got: $val"
+
+val=`./process_course/process_course.py "input.txt" -x "$index_directory/index" -k 500`
+[ "$val" = "994 185139 316" ] || fail "Expected 994 185139 316 from the saved index, got: $val"
+
+./process_course/process_course.py "input.txt" -w -x "$index_directory/index" -k 500 2>/dev/null &&
+    fail "Expected the index to be rejected with --wrong_instructions"
+./process_course/process_course.py "input.txt" --checkpoint_interval 7 -x "$index_directory/index" -k 500 2>/dev/null &&
+    fail "Expected the index to be rejected with another --checkpoint_interval"
+./process_course/process_course.py "$binary_course" -x "$index_directory/index" -k 500 2>/dev/null &&
+    fail "Expected the index to be rejected for another course"
+
+# Courses whose states could overflow 64 bits are not indexed.
+./process_course/process_course.py "$large_input" -x "$index_directory/large_index" -k 2 2>/dev/null &&
+    fail "Expected the large course to be rejected for indexing"
+[ ! -e "$index_directory/large_index" ] || fail "Expected no index to be saved for the large course"
+
 echo "All tests passed."
 exit 0
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 
+import os
+import tempfile
 import unittest
-from process_course import Submarine
+from process_course import (
+        CourseIndex, Submarine, compose_transforms, load_binary_course,
+        parse_course, save_binary_course)
 
 class TestSubmarine(unittest.TestCase):
     
@@ -98,3 +102,252 @@ class TestSubmarine(unittest.TestCase):
         s.follow_instruction('down 5')
         s.follow_instruction('forward 6')
         self.assertEqual(180, s.get_position_product())
+
+class TestBatchCourse(unittest.TestCase):
+
+    instructions = [
+        'forward 5\n',
+        'down 5\n',
+        'forward 8\n',
+        'up 3\n',
+        'down 8\n',
+        'forward 2\n']
+
+    def test_parse_course(self):
+        codes, magnitudes = parse_course(self.instructions)
+        self.assertEqual([0, 1, 0, 2, 1, 0], codes.tolist())
+        self.assertEqual([5, 5, 8, 3, 8, 2], magnitudes.tolist())
+
+    def test_parse_course_bytes(self):
+        codes, magnitudes = parse_course(
+                ''.join(self.instructions).encode().replace(b'\n', b'\r\n'))
+        self.assertEqual([0, 1, 0, 2, 1, 0], codes.tolist())
+        self.assertEqual([5, 5, 8, 3, 8, 2], magnitudes.tolist())
+
+    def test_parse_irregular_course(self):
+        # Courses not in the canonical form are parsed line by line.
+        codes, magnitudes = parse_course('forward  +5\n up 3 \ndown 12\n')
+        self.assertEqual([0, 2, 1], codes.tolist())
+        self.assertEqual([5, 3, 12], magnitudes.tolist())
+        codes, magnitudes = parse_course(['up ' + '0' * 20 + '7'])
+        self.assertEqual([7], magnitudes.tolist())
+        codes, magnitudes = parse_course(['up 99999999999999999999'])
+        self.assertEqual([99999999999999999999], magnitudes.tolist())
+
+    def test_parse_bad_course(self):
+        with self.assertRaises(ValueError):
+            parse_course(['forward 5', 'sideways 3'])
+        with self.assertRaises(ValueError):
+            parse_course(['forward 5', 'down three'])
+        with self.assertRaises(ValueError):
+            parse_course(['forward', '5 down 3'])
+        with self.assertRaises(ValueError):
+            parse_course(b'forward 5\n\ndown 3\n')
+        with self.assertRaises(ValueError):
+            parse_course(b'forward 5\nfoo 3\n')
+
+    def test_follow_wrong_instructions_batch(self):
+        s = Submarine()
+        s.follow_wrong_instructions_batch(self.instructions)
+        self.assertEqual(15, s.get_horizontal_position())
+        self.assertEqual(10, s.get_depth())
+
+    def test_follow_large_magnitudes_batch(self):
+        # These overflow 64 bit integers, so Python ints must be used.
+        instructions = [
+            'down 3000000000', 'forward 4000000000', 'up 99999999999999999999',
+            'forward 3']
+        for count in range(1, len(instructions) + 1):
+            expected = Submarine()
+            expected.follow_instructions(instructions[:count])
+            s = Submarine()
+            s.follow_instructions_batch(instructions[:count])
+            self.assertEqual(expected.get_depth(), s.get_depth())
+            self.assertEqual(expected.get_aim(), s.get_aim())
+
+            expected = Submarine()
+            expected.follow_wrong_instructions(instructions[:count])
+            s = Submarine()
+            s.follow_wrong_instructions_batch(instructions[:count])
+            self.assertEqual(expected.get_depth(), s.get_depth())
+        s = Submarine()
+        s.follow_instructions_batch(instructions[:2])
+        self.assertEqual(48000000000000000000000000000,
+                         s.get_position_product())
+
+    def test_follow_instructions_batch(self):
+        s = Submarine()
+        s.follow_instructions_batch(self.instructions)
+        self.assertEqual(15, s.get_horizontal_position())
+        self.assertEqual(60, s.get_depth())
+
+    def test_batch_continues_from_current_aim(self):
+        s = Submarine()
+        s.follow_instructions(self.instructions[:3])
+        s.follow_instructions_batch(self.instructions[3:])
+        self.assertEqual(15, s.get_horizontal_position())
+        self.assertEqual(60, s.get_depth())
+
+class TestParallelCourse(unittest.TestCase):
+
+    example_input = 'test/test_input/example_input.txt'
+
+    def test_compose_transforms(self):
+        # 'forward 5', 'down 5', 'forward 8' then 'up 3', 'down 8', 'forward 2'
+        transform = compose_transforms((13, 40, 5), (2, 10, 5))
+        self.assertEqual((15, 60, 10), transform)
+        s = Submarine()
+        s.follow_transform(transform)
+        self.assertEqual(15, s.get_horizontal_position())
+        self.assertEqual(60, s.get_depth())
+
+    def test_follow_wrong_instructions_parallel(self):
+        s = Submarine()
+        s.follow_wrong_instructions_parallel(
+                self.example_input, processes=2, chunk_size=8)
+        self.assertEqual(15, s.get_horizontal_position())
+        self.assertEqual(10, s.get_depth())
+
+    def test_follow_instructions_parallel(self):
+        s = Submarine()
+        s.follow_instructions_parallel(
+                self.example_input, processes=2, chunk_size=8)
+        self.assertEqual(15, s.get_horizontal_position())
+        self.assertEqual(60, s.get_depth())
+
+class TestBinaryCourse(unittest.TestCase):
+
+    instructions = [
+        'forward 5\n',
+        'down 5\n',
+        'forward 8\n',
+        'up 3\n',
+        'down 8\n',
+        'forward 2\n']
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'course.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        save_binary_course(*parse_course(self.instructions), self.path)
+        codes, magnitudes = load_binary_course(self.path)
+        self.assertEqual([0, 1, 0, 2, 1, 0], codes.tolist())
+        self.assertEqual([5, 5, 8, 3, 8, 2], magnitudes.tolist())
+
+        s = Submarine()
+        s.follow_course(codes, magnitudes)
+        self.assertEqual(15, s.get_horizontal_position())
+        self.assertEqual(60, s.get_depth())
+
+    def test_empty_course(self):
+        save_binary_course(*parse_course([]), self.path)
+        codes, magnitudes = load_binary_course(self.path)
+        self.assertEqual(0, len(codes))
+        self.assertEqual(0, len(magnitudes))
+
+    def test_bad_course(self):
+        with self.assertRaises(ValueError):
+            save_binary_course([0, 3], [1, 2], self.path)
+        with self.assertRaises(ValueError):
+            save_binary_course([0], [1 << 31], self.path)
+        with self.assertRaises(ValueError):
+            save_binary_course([0, 1], [1], self.path)
+
+    def test_not_a_binary_course(self):
+        with open(self.path, 'w') as course:
+            course.writelines(self.instructions)
+        with self.assertRaises(ValueError):
+            load_binary_course(self.path)
+
+    def test_truncated_course(self):
+        save_binary_course(*parse_course(self.instructions), self.path)
+        with open(self.path, 'r+b') as course:
+            course.truncate(os.path.getsize(self.path) - 1)
+        with self.assertRaises(ValueError):
+            load_binary_course(self.path)
+
+class TestCourseIndex(unittest.TestCase):
+
+    instructions = [
+        'forward 5\n',
+        'down 5\n',
+        'forward 8\n',
+        'up 3\n',
+        'down 8\n',
+        'forward 2\n']
+
+    def expected_state(self, steps, wrong_instructions=False):
+        s = Submarine()
+        if wrong_instructions:
+            s.follow_wrong_instructions(self.instructions[:steps])
+        else:
+            s.follow_instructions(self.instructions[:steps])
+        return (s.get_horizontal_position(), s.get_depth(), s.get_aim())
+
+    def test_get_state(self):
+        index = CourseIndex.build(*parse_course(self.instructions), 4)
+        self.assertEqual(6, index.get_num_instructions())
+        self.assertEqual((0, 0, 0), index.get_state(0))
+        self.assertEqual((15, 60, 10), index.get_state(6))
+        for steps in range(7):
+            self.assertEqual(self.expected_state(steps), index.get_state(steps))
+
+    def test_wrong_instructions(self):
+        index = CourseIndex.build(
+                *parse_course(self.instructions), 2, wrong_instructions=True)
+        for steps in range(7):
+            self.assertEqual(
+                    self.expected_state(steps, wrong_instructions=True),
+                    index.get_state(steps))
+
+    def test_save_and_load(self):
+        index = CourseIndex.build(*parse_course(self.instructions), 3)
+        with tempfile.TemporaryDirectory() as directory:
+            index.save(directory)
+            loaded = CourseIndex.load(directory)
+            for steps in range(7):
+                self.assertEqual(index.get_state(steps), loaded.get_state(steps))
+            self.assertEqual(3, loaded.get_checkpoint_interval())
+            self.assertFalse(loaded.follows_wrong_instructions())
+
+    def test_is_built_from(self):
+        with tempfile.TemporaryDirectory() as directory:
+            course_path = os.path.join(directory, 'course.txt')
+            with open(course_path, 'w') as course:
+                course.write(''.join(self.instructions))
+            index_path = os.path.join(directory, 'index')
+            with open(course_path) as course:
+                CourseIndex.build(
+                        *parse_course(self.instructions), 2,
+                        source=course).save(index_path)
+
+            loaded = CourseIndex.load(index_path)
+            with open(course_path) as course:
+                self.assertTrue(loaded.is_built_from(course))
+            with open(course_path, 'a') as course:
+                course.write('up 1\n')
+            with open(course_path) as course:
+                self.assertFalse(loaded.is_built_from(course))
+            # Indexes built without a file cannot be checked against one.
+            index = CourseIndex.build(*parse_course(self.instructions), 2)
+            with open(course_path) as course:
+                self.assertFalse(index.is_built_from(course))
+
+    def test_bad_queries(self):
+        with self.assertRaises(ValueError):
+            CourseIndex.build(*parse_course(self.instructions), 0)
+        # The depth of these overflows 64 bits.
+        with self.assertRaises(ValueError):
+            CourseIndex.build(
+                    *parse_course(['down 3000000000', 'forward 4000000000']))
+        with self.assertRaises(ValueError):
+            CourseIndex.build(*parse_course(['up 99999999999999999999']))
+        index = CourseIndex.build(*parse_course(self.instructions), 4)
+        with self.assertRaises(IndexError):
+            index.get_state(7)
+        with self.assertRaises(IndexError):
+            index.get_state(-1)
@@ -1 +1,2 @@
-from .process_diagnostic import BinaryStat, ReportProcessor
+from .process_diagnostic import (
+        BinaryStat, BitMatrixReport, RatingIndex, ReportProcessor)
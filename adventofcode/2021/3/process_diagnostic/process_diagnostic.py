@@ -1,8 +1,14 @@
 #!/usr/bin/env python3
 
 import argparse
+import bisect
 import sys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def parse_args():
     parser = argparse.ArgumentParser(
             description="Process the submarine's diagnostic report.")
@@ -20,6 +26,14 @@ def parse_args():
             help="Get the life support rating from the report. "
                  "By default, the power consumption rating is calculated.")
 
+    parser.add_argument(
+            '-n', '--numpy',
+            action='store_true',
+            default=False,
+            help="Load the report into a NumPy bit matrix and calculate the "
+                 "power consumption with vectorized column sums and the life "
+                 "support rating from the packed numbers.")
+
     return parser.parse_args()
 
 class BinaryStat:
@@ -94,22 +108,107 @@ class BinaryStat:
         else:
             return 1
 
+class RatingIndex:
+    """
+    An index over the numbers of a report for finding the oxygen and CO2
+    ratings.
+
+    The numbers are kept sorted, so the numbers sharing any prefix of bits,
+    the leaves under a node of a binary trie, form a contiguous run. The
+    number of them with a 0 or a 1 in the next position is found by bisecting
+    the run, and a rating is found by walking from the root to a leaf,
+    narrowing the run at each position.
+    """
+
+    def __init__(self, numbers, width):
+        """
+        Build the index.
+
+        Arguments:
+            numbers (iterable of int): The report's numbers.
+            width (int): The number of bits in each number.
+
+        >>> index = RatingIndex([0b00100, 0b11110, 0b10110], 5)
+        >>> index.get_oxygen_rating(), index.get_co2_rating()
+        (30, 4)
+        """
+        self._numbers = sorted(numbers)
+        self._width = width
+
+    def _find_rating(self, keep_most_common):
+        """
+        Walk down the bit positions, keeping the most or least common value
+        at each until a single number remains.
+
+        Ties keep 1 for the most common value and 0 for the least common one.
+        If every remaining number has the same value in a position, they are
+        all kept.
+
+        Arguments:
+            keep_most_common (bool): Whether to keep the most common value.
+
+        Raises:
+            ValueError: If the report is empty.
+
+        Return (int): The rating.
+        """
+        if not self._numbers:
+            raise ValueError("Cannot find a rating for an empty report.")
+        low = 0
+        high = len(self._numbers)
+        prefix = 0
+        for position in reversed(range(self._width)):
+            if high - low == 1:
+                break
+            bit = 1 << position
+            # The run below split has a 0 in this position.
+            split = bisect.bisect_left(self._numbers, prefix | bit, low, high)
+            zero_count = split - low
+            one_count = high - split
+            if zero_count == 0 or one_count == 0:
+                keep_one = one_count > 0
+            elif keep_most_common:
+                keep_one = one_count >= zero_count
+            else:
+                keep_one = one_count < zero_count
+            if keep_one:
+                low = split
+                prefix |= bit
+            else:
+                high = split
+        return self._numbers[low]
+
+    def get_oxygen_rating(self):
+        """
+        Return the oxygen rating, per ReportProcessor.get_oxygen_rating.
+        """
+        return self._find_rating(keep_most_common=True)
+
+    def get_co2_rating(self):
+        """
+        Return the CO2 rating, per ReportProcessor.get_co2_rating.
+        """
+        return self._find_rating(keep_most_common=False)
+
 class ReportProcessor:
     def __init__(self):
         self._binary_stats = []
         self._numbers = []
+        self._rating_index = None
 
     def process_number(self, number):
         """
         Process the binary number and update stats accordingly.
         """
-        while len(number) > len(self._binary_stats):
-            self._binary_stats.insert(0, BinaryStat())
+        missing_stats = len(number) - len(self._binary_stats)
+        if missing_stats > 0:
+            self._binary_stats[:0] = [BinaryStat() for _ in range(missing_stats)]
 
         for index, binary in enumerate(number):
             self._binary_stats[index].process_binary(binary)
 
         self._numbers.append(number)
+        self._rating_index = None
 
     def get_num_entries(self):
         """
@@ -127,55 +226,16 @@ class ReportProcessor:
         """
         return len(self._numbers)
 
-    def _filter_co2_report(self, position):
-        """
-        Filter the report for CO2 data and return a new report with the
-        subset of data.
-
-        >>> r = ReportProcessor()
-        >>> r.process_number('00100')
-        >>> r.process_number('11110')
-        >>> r.process_number('10110')
-        >>> new_r = r._filter_co2_report(0)
-        >>> new_r.get_num_entries()
-        1
-        """
-        new_report = ReportProcessor()
-        try:
-            position_filter = self._binary_stats[position].get_minority()
-        except RuntimeError:
-            position_filter = 0
-        for number in self._numbers:
-            if number[position] == str(position_filter):
-                new_report.process_number(number)
-        return new_report
-
-    def _filter_oxygen_report(self, position):
+    def _get_rating_index(self):
         """
-        Filter the report for oxygen data and return a new report with the
-        subset of data.
-
-        >>> r = ReportProcessor()
-        >>> r.process_number('00100')
-        >>> r.process_number('11110')
-        >>> r.process_number('10110')
-        >>> new_r = r._filter_oxygen_report(0)
-        >>> new_r.get_num_entries()
-        2
-        >>> new_r = new_r._filter_oxygen_report(1)
-        >>> new_r.get_num_entries()
-        1
+        Return the RatingIndex for the numbers processed so far, building it
+        if needed.
         """
-        new_report = ReportProcessor()
-        try:
-            position_filter = self._binary_stats[position].get_preponderance()
-        except RuntimeError:
-            position_filter = 1
-        for number in self._numbers:
-            if number[position] == str(position_filter):
-                new_report.process_number(number)
-        return new_report
-
+        if self._rating_index is None:
+            self._rating_index = RatingIndex(
+                    (int(number, 2) for number in self._numbers),
+                    len(self._binary_stats))
+        return self._rating_index
 
     def get_epsilon(self):
         """
@@ -248,12 +308,7 @@ class ReportProcessor:
         >>> r.get_oxygen_rating() == 0b11110
         True
         """
-        new_report = self
-        for position in range(len(self._binary_stats)):
-            new_report = new_report._filter_oxygen_report(position)
-            if new_report.get_num_entries() == 1:
-                break;
-        return int(new_report._numbers[0], 2)
+        return self._get_rating_index().get_oxygen_rating()
 
     def get_co2_rating(self):
         """
@@ -272,12 +327,7 @@ class ReportProcessor:
         >>> r.get_co2_rating() == 0b00100
         True
         """
-        new_report = self
-        for position in range(len(self._binary_stats)):
-            new_report = new_report._filter_co2_report(position)
-            if new_report.get_num_entries() == 1:
-                break;
-        return int(new_report._numbers[0], 2)
+        return self._get_rating_index().get_co2_rating()
     
     def get_life_support_rating(self):
         """
@@ -298,9 +348,134 @@ class ReportProcessor:
         return self.get_oxygen_rating() * self.get_co2_rating()
 
 
+class BitMatrixReport:
+    """
+    A diagnostic report held as a matrix of bits, one row per number, so that
+    the counts of every bit position come from a single column sum.
+    """
+
+    def __init__(self, numbers):
+        """
+        Load the binary numbers into the bit matrix.
+
+        Arguments:
+            numbers (iterable of str): The binary numbers, all the same width.
+
+        Raises:
+            ValueError: If the numbers differ in width or are not binary.
+
+        >>> r = BitMatrixReport(['00100', '11110', '10110'])
+        >>> r.get_num_entries()
+        3
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for a BitMatrixReport.")
+        numbers = list(numbers)
+        widths = set(map(len, numbers))
+        if len(widths) > 1:
+            raise ValueError(f"Numbers differ in width: {sorted(widths)}")
+        width = widths.pop() if widths else 0
+        try:
+            characters = ''.join(numbers).encode('ascii')
+        except UnicodeEncodeError:
+            raise ValueError("Non-binary value in report.")
+        # Subtracting from the unsigned characters wraps anything below '0',
+        # so every non-binary character ends up greater than 1.
+        bits = np.frombuffer(characters, dtype=np.uint8) - ord('0')
+        if bits.size and bits.max() > 1:
+            raise ValueError("Non-binary value in report.")
+        self._bits = bits.reshape(len(numbers), width)
+
+    def get_num_entries(self):
+        """
+        Return the number of entries in the report.
+        """
+        return self._bits.shape[0]
+
+    def _get_one_majorities(self):
+        """
+        Return whether ones outnumber zeros for each bit position.
+
+        Raises:
+            RuntimeError: If a position has the same number of ones and zeros.
+        """
+        one_counts = self._bits.sum(axis=0, dtype=np.int64)
+        zero_counts = self.get_num_entries() - one_counts
+        ties = one_counts == zero_counts
+        if ties.any():
+            raise RuntimeError(
+                    "Same number of ones and zeros: "
+                    f"{zero_counts[ties.argmax()]}")
+        return one_counts > zero_counts
+
+    def get_gamma(self):
+        """
+        Return the gamma number from the report, per
+        ReportProcessor.get_gamma.
+
+        >>> BitMatrixReport(['00100', '11110', '10110']).get_gamma()
+        22
+        """
+        majorities = self._get_one_majorities()
+        return int(''.join('1' if one else '0' for one in majorities) or '0', 2)
+
+    def get_epsilon(self):
+        """
+        Return the epsilon number from the report, per
+        ReportProcessor.get_epsilon.
+
+        >>> BitMatrixReport(['00100', '11110', '10110']).get_epsilon()
+        9
+        """
+        majorities = self._get_one_majorities()
+        return int(''.join('0' if one else '1' for one in majorities) or '0', 2)
+
+    def get_power_consumption(self):
+        """
+        Return the power consumption, the product of the gamma and epsilon
+        values.
+
+        >>> BitMatrixReport(['00100', '11110', '10110']).get_power_consumption()
+        198
+        """
+        return self.get_gamma() * self.get_epsilon()
+
+    def _get_rating_index(self):
+        """
+        Pack the rows of the bit matrix into numbers and return a RatingIndex
+        over them.
+        """
+        num_entries, width = self._bits.shape
+        # Python ints are used for numbers too wide for 64 bits.
+        dtype = np.uint64 if width <= 64 else object
+        numbers = np.zeros(num_entries, dtype=dtype)
+        for column in self._bits.T:
+            numbers = numbers * 2 + column.astype(dtype)
+        return RatingIndex(np.sort(numbers).tolist(), width)
+
+    def get_life_support_rating(self):
+        """
+        Return the life support rating, per
+        ReportProcessor.get_life_support_rating.
+
+        >>> BitMatrixReport(['00100', '11110', '10110']).get_life_support_rating()
+        120
+        """
+        index = self._get_rating_index()
+        return index.get_oxygen_rating() * index.get_co2_rating()
+
+
 def main():
     args = parse_args()
 
+    if args.numpy:
+        report = BitMatrixReport(line.strip() for line in args.report)
+        if args.get_life_support_rating:
+            print(report.get_life_support_rating())
+        else:
+            print(report.get_power_consumption())
+        return 0
+
     report_processor = ReportProcessor()
     for line in args.report:
         binary_number = line.strip()
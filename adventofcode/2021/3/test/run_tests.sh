@@ -23,6 +23,11 @@ val=`${script} 'input.txt'`
 val=`${script} -l 'input.txt'`
 [ ${val} -eq 4550283 ] || fail "Unexpected part a power consuption. Expected 4550283, got ${val}."
 
+val=`${script} -n 'input.txt'`
+[ ${val} -eq 3633500 ] || fail "Unexpected bit matrix power consuption. Expected 3633500, got ${val}."
+
+val=`${script} -n -l 'input.txt'`
+[ ${val} -eq 4550283 ] || fail "Unexpected bit matrix life support rating. Expected 4550283, got ${val}."
 
 echo "All tests passed."
 exit 0
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
-from process_diagnostic import BinaryStat, ReportProcessor
+from process_diagnostic import (
+        BinaryStat, BitMatrixReport, RatingIndex, ReportProcessor)
 import unittest
 
 class TestBinaryStat(unittest.TestCase):
@@ -78,3 +79,79 @@ class TestReportProcessor(unittest.TestCase):
 
     def test_get_life_support_rating(self):
         self.assertEqual(230, self.report_processor.get_life_support_rating())
+
+class TestBitMatrixReport(unittest.TestCase):
+    def setUp(self):
+        self.report = BitMatrixReport([
+                '00100', '11110', '10110', '10111', '10101', '01111',
+                '00111', '11100', '10000', '11001', '00010', '01010'])
+
+    def test_get_num_entries(self):
+        self.assertEqual(12, self.report.get_num_entries())
+        self.assertEqual(0, BitMatrixReport([]).get_num_entries())
+
+    def test_get_gamma(self):
+        self.assertEqual(22, self.report.get_gamma())
+
+    def test_get_epsilon(self):
+        self.assertEqual(9, self.report.get_epsilon())
+
+    def test_get_power_consumption(self):
+        self.assertEqual(198, self.report.get_power_consumption())
+
+    def test_get_life_support_rating(self):
+        self.assertEqual(230, self.report.get_life_support_rating())
+
+    def test_tie(self):
+        report = BitMatrixReport(['01', '11'])
+        with self.assertRaises(RuntimeError):
+            report.get_gamma()
+
+    def test_wide_numbers(self):
+        # Numbers wider than 64 bits are packed into Python ints.
+        numbers = [
+                '1' * 70, '0' * 69 + '1', '10' * 35, '01' * 35,
+                '1' * 35 + '0' * 35]
+        processor = ReportProcessor()
+        for number in numbers:
+            processor.process_number(number)
+        report = BitMatrixReport(numbers)
+        self.assertEqual(
+                processor.get_life_support_rating(),
+                report.get_life_support_rating())
+        self.assertEqual(
+                processor.get_power_consumption(),
+                report.get_power_consumption())
+
+    def test_bad_numbers(self):
+        with self.assertRaises(ValueError):
+            BitMatrixReport(['01', '1'])
+        with self.assertRaises(ValueError):
+            BitMatrixReport(['01', '12'])
+
+class TestRatingIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = RatingIndex([
+                0b00100, 0b11110, 0b10110, 0b10111, 0b10101, 0b01111,
+                0b00111, 0b11100, 0b10000, 0b11001, 0b00010, 0b01010], 5)
+
+    def test_get_oxygen_rating(self):
+        self.assertEqual(23, self.index.get_oxygen_rating())
+
+    def test_get_co2_rating(self):
+        self.assertEqual(10, self.index.get_co2_rating())
+
+    def test_ties(self):
+        index = RatingIndex([0b01, 0b10], 2)
+        self.assertEqual(0b10, index.get_oxygen_rating())
+        self.assertEqual(0b01, index.get_co2_rating())
+
+    def test_shared_bits_are_kept(self):
+        # Every number has a 1 in the first position, so none are dropped.
+        index = RatingIndex([0b110, 0b101, 0b100], 3)
+        self.assertEqual(0b101, index.get_oxygen_rating())
+        self.assertEqual(0b110, index.get_co2_rating())
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            RatingIndex([], 5).get_oxygen_rating()